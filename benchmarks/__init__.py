@@ -0,0 +1,5 @@
+"""Benchmarks for the engine, combat and web hot paths.
+
+Run ``python -m benchmarks`` from the repository root; see ``--help`` for options.
+"""
+from .runner import BenchmarkResult, measure, measure_memory
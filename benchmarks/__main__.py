@@ -0,0 +1,77 @@
+import argparse
+import json
+import platform
+import sys
+import time
+
+from .game_benchmarks import BENCHMARKS as GAME_BENCHMARKS
+from .runner import BenchmarkResult
+from .web_benchmarks import BENCHMARKS as WEB_BENCHMARKS
+
+BENCHMARKS = {**GAME_BENCHMARKS, **WEB_BENCHMARKS}
+
+
+def run(groups, iterations, sessions, seed):
+    """Run the chosen benchmark groups and return their results as plain data."""
+    results = []
+    for group in groups:
+        # the memory benchmark counts sessions instead of timed iterations
+        size = sessions if group == "memory" else iterations
+        for result in BENCHMARKS[group](size, seed):
+            results.append(result.summary() if isinstance(result, BenchmarkResult) else result)
+    return results
+
+
+def compare(results, baseline):
+    """Print how each result moved against the same benchmark in a previous run."""
+    previous = {(entry["group"], entry["name"]): entry for entry in baseline["results"]}
+    for entry in results:
+        old = previous.get((entry["group"], entry["name"]))
+        if old is None:
+            continue
+        if "ops_per_sec" in entry and old.get("ops_per_sec"):
+            change = entry["ops_per_sec"] / old["ops_per_sec"] - 1
+            print(f"{entry['group']:>8}  {entry['name']:<32} ops/sec {change:+7.1%}")
+        elif "bytes" in entry and old.get("bytes"):
+            change = entry["bytes"] / old["bytes"] - 1
+            print(f"{entry['group']:>8}  {entry['name']:<32} bytes   {change:+7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the game's hot paths and write the results as JSON.")
+    parser.add_argument("groups", nargs="*", metavar="group",
+                        help=f"benchmark groups to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("-n", "--iterations", type=int, default=1000, help="timed calls per benchmark")
+    parser.add_argument("--sessions", type=int, default=200, help="live sessions for the memory benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="a previous JSON report to compare against")
+    args = parser.parse_args()
+
+    unknown = [group for group in args.groups if group not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark group: {', '.join(unknown)}")
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "seed": args.seed,
+        "results": run(args.groups or list(BENCHMARKS), args.iterations, args.sessions, args.seed),
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report["results"], json.load(f))
+
+
+if __name__ == "__main__":
+    main()
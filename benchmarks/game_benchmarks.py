@@ -0,0 +1,111 @@
+from itertools import count
+
+from game.characters import Orc, Elf, Human
+from game.combat import Combat
+from game.command_processor import process_command
+from game.engine import GameEngine
+from game.output import OutputBuffer
+from game.world import World
+
+from .runner import measure, measure_memory
+
+# out-of-combat commands timed one by one; "{enemy}" is filled in with a live enemy name
+COMMANDS = ("help", "look", "regions", "enemies", "examine {enemy}", "stats", "inventory", "use 2",
+            "unknown")
+
+
+def new_session(seed):
+    """Set up an engine the way /api/new_game does: player, populated world and starting items."""
+    engine = GameEngine(output=OutputBuffer(), seed=seed)
+    engine.player = Human("Bench")
+    engine.world = World(engine.player, output=engine.output, rng=engine.rng)
+    engine._give_starting_items()
+    engine.output.drain()
+    return engine
+
+
+def bench_engine_setup(iterations, seed):
+    seeds = count(seed)
+    return [measure("engine", "setup", lambda: new_session(next(seeds)), iterations)]
+
+
+def bench_commands(iterations, seed):
+    engine = new_session(seed)
+    results = []
+
+    for template in COMMANDS:
+        def run(text=template):
+            command = text.format(enemy=engine.world.enemies[0].name) if engine.world.enemies else text
+            process_command(command, engine)
+            engine.output.drain()
+        results.append(measure("commands", template.split()[0], run, iterations))
+
+    def start_combat(command):
+        def run():
+            process_command(command, engine)
+            engine.output.drain()
+            # back out of the fight so the next iteration starts another one
+            engine.in_combat = False
+            engine.active_combat = None
+        return run
+
+    results.append(measure("commands", "encounter", start_combat("encounter"), iterations))
+    results.append(measure("commands", "attack",
+                           start_combat(f"attack {engine.world.enemies[0].name}"), iterations))
+    return results
+
+
+def bench_travel(iterations, seed):
+    engine = new_session(seed)
+    regions = list(engine.world.regions)
+    trips = count()
+
+    def run():
+        process_command(f"travel {regions[next(trips) % len(regions)]}", engine)
+        engine.output.drain()
+
+    return [measure("commands", "travel", run, iterations)]
+
+
+def bench_combat_turns(iterations, seed):
+    engine = new_session(seed)
+    player, enemy = Orc("Bench"), Elf("Target")
+    # enough health on both sides that the fight outlasts the benchmark
+    for character in (player, enemy):
+        character.max_health = character.health = 10 ** 9
+    combat = Combat(player, enemy, engine.rng)
+    combat.turn_order = "player"
+
+    results = []
+    for action in ("attack", "special"):
+        results.append(measure("combat", f"process_action {action}",
+                               lambda action=action: combat.process_action(action), iterations))
+    return results
+
+
+def bench_full_fights(iterations, seed):
+    engine = new_session(seed)
+
+    def fight():
+        combat = Combat(Human("Bench"), Orc("Target"), engine.rng)
+        combat.start_combat()
+        while combat.combat_active and combat.turn_order == "player":
+            combat.process_action("attack")
+
+    return [measure("combat", "full fight", fight, iterations)]
+
+
+def bench_session_memory(sessions, seed):
+    """Report the memory a live session keeps, next to the timing results."""
+    per_session = measure_memory(lambda i: new_session(seed + i), sessions)
+    return [{"group": "memory", "name": "bytes per session", "sessions": sessions, "bytes": per_session}]
+
+
+BENCHMARKS = {
+    "engine": bench_engine_setup,
+    "commands": bench_commands,
+    "travel": bench_travel,
+    "combat": bench_combat_turns,
+    "fights": bench_full_fights,
+    "memory": bench_session_memory,
+}
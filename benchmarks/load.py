@@ -0,0 +1,251 @@
+"""Drive many simulated players against the web API and report how the server holds up.
+
+Run ``python -m benchmarks.load`` to play in-process against the Flask app, or
+add ``--url http://127.0.0.1:5000`` to play against a running server over HTTP
+(pass its ``--pid`` to track its memory too).
+"""
+import argparse
+import json
+import os
+import random as rd
+import resource
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from .web_benchmarks import _test_client
+
+# what an idle player types, and how often
+EXPLORE_MIX = (
+    ("look", 20),
+    ("enemies", 15),
+    ("travel", 10),
+    ("encounter", 25),
+    ("inventory", 10),
+    ("stats", 10),
+    ("regions", 5),
+    ("help", 5),
+)
+
+# what a player in a fight types, and how often
+COMBAT_MIX = (
+    ("attack", 60),
+    ("special", 20),
+    ("use", 12),
+    ("flee", 8),
+)
+
+REGIONS = ("forest", "plains", "mountains")
+
+
+class FlaskTarget:
+    """Sends requests through the Flask test client, in this process."""
+
+    def __init__(self):
+        self.client = _test_client()
+
+    def post(self, path, body):
+        response = self.client.post(path, json=body)
+        return response.status_code, response.get_json()
+
+
+class HttpTarget:
+    """Sends requests to a running server over HTTP."""
+
+    def __init__(self, url, timeout=10):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def post(self, path, body):
+        request = urllib.request.Request(self.url + path, data=json.dumps(body).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, None
+
+
+class Stats:
+    """Latencies and errors seen by one player thread, per verb."""
+
+    def __init__(self):
+        self.latencies = {}  # verb -> [seconds, ...]
+        self.errors = {}  # verb -> count
+
+    def record(self, verb, seconds, ok):
+        self.latencies.setdefault(verb, []).append(seconds)
+        if not ok:
+            self.errors[verb] = self.errors.get(verb, 0) + 1
+
+    def merge(self, other):
+        for verb, samples in other.latencies.items():
+            self.latencies.setdefault(verb, []).extend(samples)
+        for verb, count in other.errors.items():
+            self.errors[verb] = self.errors.get(verb, 0) + count
+
+
+def _pick(rng, mix):
+    return rng.choices([verb for verb, _ in mix], weights=[weight for _, weight in mix])[0]
+
+
+def _request(target, stats, verb, path, body):
+    start = time.perf_counter()
+    try:
+        status, data = target.post(path, body)
+    except (OSError, ValueError):
+        status, data = None, None
+    ok = status == 200 and isinstance(data, dict)
+    stats.record(verb, time.perf_counter() - start, ok)
+    return data if ok else None
+
+
+def play(target, seed, deadline, stats):
+    """Play games one after another until ``deadline``, recording every request in ``stats``."""
+    rng = rd.Random(seed)
+    state = None
+
+    while time.monotonic() < deadline:
+        if state is None:
+            state = _request(target, stats, "new_game", "/api/new_game",
+                             {"name": f"Load{seed}", "race": rng.choice(("orc", "elf", "human"))})
+            if state is None:
+                time.sleep(0.05)  # do not spin on a server that is refusing new games
+            continue
+
+        if state.get("in_combat"):
+            verb = _pick(rng, COMBAT_MIX)
+        else:
+            verb = _pick(rng, EXPLORE_MIX)
+
+        command = verb
+        if verb == "travel":
+            command = f"travel {rng.choice(REGIONS)}"
+        elif verb == "use":
+            inventory = state.get("player", {}).get("inventory") or [None]
+            command = f"use {rng.randint(1, len(inventory))}"
+
+        response = _request(target, stats, verb, "/api/command", {"game_id": state["game_id"], "command": command})
+        if response is None or response.get("game_over") or response.get("quit"):
+            state = None  # start over with a fresh game
+        else:
+            state.update(response)
+
+
+def rss_bytes(pid):
+    """Resident memory of a process, or None if it cannot be read."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid == os.getpid():
+        # peak rather than current, but better than nothing where /proc is missing
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    if not samples:
+        return {}
+
+    def at(fraction):
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000
+
+    return {"p50_ms": at(0.50), "p90_ms": at(0.90), "p99_ms": at(0.99), "max_ms": samples[-1] * 1000}
+
+
+def run(target, players, duration, seed=0, pid=None, sample_interval=1.0):
+    """Run ``players`` simulated players for ``duration`` seconds and return the report as plain data."""
+    pid = pid or os.getpid()
+    start = time.monotonic()
+    deadline = start + duration
+    memory = []
+    done = threading.Event()
+
+    def sample_memory():
+        while True:
+            memory.append({"elapsed_s": round(time.monotonic() - start, 3), "rss_bytes": rss_bytes(pid)})
+            if done.wait(sample_interval):
+                return
+
+    per_player = [Stats() for _ in range(players)]
+    threads = [threading.Thread(target=play, args=(target, seed + i, deadline, per_player[i]), daemon=True)
+               for i in range(players)]
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    sampler.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    done.set()
+    sampler.join()
+
+    stats = Stats()
+    for player_stats in per_player:
+        stats.merge(player_stats)
+
+    all_samples = [sample for samples in stats.latencies.values() for sample in samples]
+    errors = sum(stats.errors.values())
+    rss = [entry["rss_bytes"] for entry in memory if entry["rss_bytes"] is not None]
+
+    return {
+        "players": players,
+        "duration_s": elapsed,
+        "requests": len(all_samples),
+        "requests_per_sec": len(all_samples) / elapsed if elapsed else 0.0,
+        "errors": errors,
+        "error_rate": errors / len(all_samples) if all_samples else 0.0,
+        "latency": _percentiles(all_samples),
+        "verbs": {
+            verb: {"requests": len(samples), "errors": stats.errors.get(verb, 0), **_percentiles(samples)}
+            for verb, samples in sorted(stats.latencies.items())
+        },
+        "rss_growth_bytes": rss[-1] - rss[0] if rss else None,
+        "memory": memory,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent players and report throughput, "
+                                                 "latency, errors and server memory as JSON.")
+    parser.add_argument("-p", "--players", type=int, default=50, help="concurrent simulated players")
+    parser.add_argument("-d", "--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--url", help="base URL of a running server; default is the Flask app in this process")
+    parser.add_argument("--pid", type=int, help="server process to sample RSS from when using --url")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between RSS samples")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    if args.url:
+        target = HttpTarget(args.url)
+    else:
+        try:
+            target = FlaskTarget()
+        except ImportError as e:
+            parser.error(f"the in-process target needs Flask ({e}); install it or pass --url")
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "target": args.url or "in-process",
+        **run(target, args.players, args.duration, args.seed, args.pid, args.interval),
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import gc
+import time
+import tracemalloc
+
+
+class BenchmarkResult:
+    """Timings of one benchmarked operation."""
+
+    def __init__(self, group, name, samples_ns):
+        self.group = group
+        self.name = name
+        self.samples_ns = sorted(samples_ns)
+
+    @property
+    def ops_per_sec(self):
+        total = sum(self.samples_ns)
+        return len(self.samples_ns) / (total / 1e9) if total else 0.0
+
+    def percentile(self, fraction):
+        """Return the given percentile of the samples in microseconds."""
+        if not self.samples_ns:
+            return 0.0
+        index = min(len(self.samples_ns) - 1, int(fraction * len(self.samples_ns)))
+        return self.samples_ns[index] / 1000
+
+    def summary(self):
+        """Return the result as plain data, e.g. for JSON output."""
+        return {
+            "group": self.group,
+            "name": self.name,
+            "iterations": len(self.samples_ns),
+            "ops_per_sec": self.ops_per_sec,
+            "p50_us": self.percentile(0.50),
+            "p99_us": self.percentile(0.99),
+        }
+
+
+def measure(group, name, operation, iterations, warmup=10):
+    """Call ``operation`` repeatedly and time every call on its own."""
+    for _ in range(min(warmup, iterations)):
+        operation()
+
+    samples = []
+    clock = time.perf_counter_ns
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # collections would land on random samples and skew the tail
+    try:
+        for _ in range(iterations):
+            start = clock()
+            operation()
+            samples.append(clock() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return BenchmarkResult(group, name, samples)
+
+
+def measure_memory(create, count):
+    """Return the bytes allocated per object when ``count`` objects made by ``create`` are kept alive."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        kept = [create(i) for i in range(count)]
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del kept
+    return (after - before) / count
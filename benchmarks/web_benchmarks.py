@@ -0,0 +1,44 @@
+import os
+import sys
+from itertools import count
+
+from .runner import measure
+
+SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "web", "server"))
+
+
+def _test_client():
+    """Return a Flask test client for the web server, keeping sessions in memory."""
+    os.environ.setdefault("MORDOR_SESSION_STORE", "memory")
+    if SERVER_DIR not in sys.path:
+        sys.path.insert(0, SERVER_DIR)
+    import server
+    return server.app.test_client()
+
+
+def bench_web(iterations, seed):
+    try:
+        client = _test_client()
+    except ImportError as e:
+        # Flask is only needed for the web server, not for the rest of the suite
+        return [{"group": "web", "name": "skipped", "reason": str(e)}]
+
+    seeds = count(seed)
+    new_game = {"name": "Bench", "race": "human"}
+
+    results = [measure("web", "POST /api/new_game",
+                       lambda: client.post("/api/new_game", json={**new_game, "seed": next(seeds)}),
+                       iterations)]
+
+    game_id = client.post("/api/new_game", json={**new_game, "seed": seed}).get_json()["game_id"]
+    for command in ("look", "inventory", "stats", "enemies"):
+        results.append(measure("web", f"POST /api/command {command}",
+                               lambda command=command: client.post("/api/command", json={
+                                   "game_id": game_id, "command": command}),
+                               iterations))
+    return results
+
+
+BENCHMARKS = {
+    "web": bench_web,
+}
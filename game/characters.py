@@ -1,19 +1,50 @@
+from functools import lru_cache
+from .content import ContentError, load_content
 from .game_object import GameObject
+from .inventory import Inventory
 import random as rd
 
 
+class RaceTemplate:
+    """Base stats shared by every character of one race."""
+    __slots__ = ("race", "health", "attack_power", "defense")
+
+    def __init__(self, race, health, attack_power, defense=0):
+        self.race = race
+        self.health = health
+        self.attack_power = attack_power
+        self.defense = defense
+
+    @classmethod
+    def from_content(cls, race):
+        """Template with the base stats content.json gives a race."""
+        stats = load_content().races.get(race)
+        if stats is None:
+            raise ContentError(f"content.json: no stats for the {race} race")
+        return cls(race, stats.health, stats.attack_power, stats.defense)
+
+
+@lru_cache(maxsize=None)
+def _character_description(race, health):
+    # one string per race and health, shared by every character that matches
+    return f"{GameObject.get_article(race)} {race} warrior with {health} HP."
+
+
 class Character(GameObject):
     """Base class for all characters in the game."""
+    __slots__ = ("race", "_health", "_max_health", "_attack_power", "_defense", "stats_version", "inventory",
+                 "inventory_version", "equipped_weapon", "equipped_armor", "equipped_charm")
 
     def __init__(self, name, race, health, attack_power):
-        description = f"{GameObject.get_article(race)} {race} warrior with {health} HP."
-        super().__init__(name, description)
+        super().__init__(name, _character_description(race, health))
         self.race = race
         self._health = health
         self._max_health = health  # store max health for healing purposes
         self._attack_power = attack_power
         self._defense = 0
-        self.inventory = []
+        self.stats_version = 0  # bumped by every setter below, so snapshots can skip characters that did not change
+        self.inventory = Inventory()
+        self.inventory_version = 0  # bumped on every inventory change so rendered listings can be reused
         self.equipped_weapon = None
         self.equipped_armor = None
         self.equipped_charm = None
@@ -27,6 +58,7 @@ class Character(GameObject):
     def health(self, value):
         """Set the character's health, ensuring it stays withing bounds."""
         self._health = max(0, min(value, self.max_health))
+        self.stats_version += 1
 
     @property
     def max_health(self):
@@ -39,6 +71,7 @@ class Character(GameObject):
         self._max_health = max(1, value)
         if self._health > self._max_health:
             self._health = self.max_health
+        self.stats_version += 1
 
     @property
     def attack_power(self):
@@ -52,6 +85,7 @@ class Character(GameObject):
     def attack_power(self, value):
         """Set the character's base attack power."""
         self._attack_power = max(1, value)
+        self.stats_version += 1
 
     @property
     def defense(self):
@@ -64,27 +98,11 @@ class Character(GameObject):
     def defense(self, value):
         """Set the character's base defense."""
         self._defense = max(0, value)
+        self.stats_version += 1
 
     def is_alive(self):
         return self.health > 0
 
-    def attack(self, target):
-        if not isinstance(target, Character):
-            return f"{target.name} is not a valid target!"
-
-        damage = rd.randint(1, self.attack_power)
-
-        # armor reduces incoming damage but never below 1
-        if hasattr(target, 'defense') and target.defense > 0:
-            reduced_damage = max(1, damage - target.defense)  # minimum 1 damage
-            damage_blocked = damage - reduced_damage
-            damage = reduced_damage
-            target.health = max(0, target.health - damage)
-            return f"{self.name} attacks {target.name} for {damage} damage! {target.name}'s armor blocks {damage_blocked} damage. {target.name} now has {target.health} HP."
-        else:
-            target.health = max(0, target.health - damage)
-            return f"{self.name} attacks {target.name} for {damage} damage! {target.name} now has {target.health} HP."
-
     def heal(self, amount):
         """Heal the character by the specified amount, not exceeding max health."""
         original_health = self.health
@@ -94,18 +112,23 @@ class Character(GameObject):
 
     def add_item(self, item):
         """Add an item to the character's inventory if there's space."""
-        if len(self.inventory) >= 10:  # limit inventory to 10 items
+        # identical consumables share a slot, anything else needs one of the free slots
+        if not self.inventory.add(item):
             return f"{self.name}'s inventory is full! Drop something first."
-        self.inventory.append(item)
+        self.inventory_changed()
         return f"{self.name} acquires {item.name}!"
 
     def remove_item(self, item):
         """Remove an item from the character's inventory."""
-        if item in self.inventory:
-            self.inventory.remove(item)
+        if self.inventory.remove(item):
+            self.inventory_changed()
             return f"{self.name} no longer has {item.name}."
         return f"{self.name} doesn't have {item.name}."
 
+    def inventory_changed(self):
+        """Note that the inventory or what is equipped from it changed."""
+        self.inventory_version += 1
+
     def show_stats(self):
         """Display the character's current stats."""
         stats = (
@@ -125,14 +148,18 @@ class Character(GameObject):
 
 
 class Orc(Character):
+    __slots__ = ()
+    # Orcs get a slight defense boost
+    template = RaceTemplate.from_content("Orc")
+
     def __init__(self, name):
-        super().__init__(name, "Orc", 20, 5)
-        # Orcs get a slight defense boost
-        self.defense = 1
+        super().__init__(name, self.template.race, self.template.health, self.template.attack_power)
+        self.defense = self.template.defense
 
-    def special_ability(self, target):
+    def special_ability(self, target, rng=None):
         """Orcs have Berserker Rage: deal high damage but take recoil damage."""
-        damage = rd.randint(self.attack_power, self.attack_power * 2)
+        rng = rng or rd
+        damage = rng.randint(self.attack_power, self.attack_power * 2)
         target.health -= damage
 
         recoil = max(1, damage // 4)  # recoil scales with damage dealt
@@ -143,14 +170,18 @@ class Orc(Character):
 
 
 class Elf(Character):
+    __slots__ = ()
+    # Elves have higher attack but lower health
+    template = RaceTemplate.from_content("Elf")
+
     def __init__(self, name):
-        super().__init__(name, "Elf", 15, 6)
-        # Elves have higher attack but lower health
+        super().__init__(name, self.template.race, self.template.health, self.template.attack_power)
 
-    def special_ability(self, target):
+    def special_ability(self, target, rng=None):
         """Elves have Precision Strike: guaranteed hit with critical chance."""
+        rng = rng or rd
         # elves have higher crit chance representing their accuracy
-        critical = rd.random() < 0.4  # 40% chance for critical hit
+        critical = rng.random() < 0.4  # 40% chance for critical hit
         damage = self.attack_power * (2 if critical else 1)
         target.health -= damage
 
@@ -161,19 +192,30 @@ class Elf(Character):
 
 
 class Human(Character):
+    __slots__ = ()
+    # Humans are balanced
+    template = RaceTemplate.from_content("Human")
+
     def __init__(self, name):
-        super().__init__(name, "Human", 18, 4)
-        # Humans are balanced
+        super().__init__(name, self.template.race, self.template.health, self.template.attack_power)
 
-    def special_ability(self, target=None):
+    def special_ability(self, target=None, rng=None):
         """Humans have Resilience: restore health and gain temporary defense."""
+        rng = rng or rd
         # defensive ability that represents human adaptability
-        heal_amount = rd.randint(2, 5)
+        heal_amount = rng.randint(2, 5)
         original_health = self.health
         self.health += heal_amount
         actual_heal = self.health - original_health
 
         # temporary defense boost only lasts for the next attack
-        self._defense += 2
+        self.defense = self._defense + 2
+
+        return f"{self.name} shows resilience, healing for {actual_heal} HP and gaining +2 defense for the next attack!"
+
 
-        return f"{self.name} shows resilience, healing for {actual_heal} HP and gaining +2 defense for the next attack!"
\ No newline at end of file
+# character class per race; a race's special ability lives in its class, so content cannot add races on its own
+RACE_CLASSES = {cls.template.race: cls for cls in (Orc, Elf, Human)}
+for _race in load_content().races:
+    if _race not in RACE_CLASSES:
+        raise ContentError(f"content.json: the {_race} race has no character class")
@@ -4,8 +4,10 @@ import random as rd
 class Combat:
     """Handles combat between the player and enemies."""
 
-    def __init__(self, player, enemy):
+    def __init__(self, player, enemy, rng=None):
         self.player = player
+        # every roll comes from the session's generator so fights can be replayed
+        self.rng = rng or rd
         # handle both direct character objects and enemy containers
         if hasattr(enemy, 'character'):
             self.enemy = enemy.character
@@ -17,7 +19,7 @@ class Combat:
 
     def determine_turn_order(self):
         """Determine who attacks first using a random coin flip."""
-        return "player" if rd.choice(["heads", "tails"]) == "heads" else "enemy"
+        return "player" if self.rng.choice(["heads", "tails"]) == "heads" else "enemy"
 
     def log(self, message):
         """Add a message to the combat log."""
@@ -26,8 +28,8 @@ class Combat:
     def attack(self, attacker, target, attack_type="normal"):
         """Handle an attack from the attacker to the target."""
         # critical hits provide excitement and variability in combat
-        is_critical = rd.random() < 0.2  # 20% chance for critical hit
-        damage = rd.randint(1, attacker.attack_power)
+        is_critical = self.rng.random() < 0.2  # 20% chance for critical hit
+        damage = self.rng.randint(1, attacker.attack_power)
 
         # apply critical hit bonus
         if is_critical:
@@ -36,7 +38,7 @@ class Combat:
 
         # special attacks are more powerful but limited resource
         if attack_type == "special":
-            damage += rd.randint(1, 3)  # bonus damage for special attacks
+            damage += self.rng.randint(1, 3)  # bonus damage for special attacks
             self.log(f"{attacker.name} uses a special attack!")
 
         # apply damage and ensure health never goes below zero
@@ -119,7 +121,7 @@ class Combat:
                 if hasattr(self.player, 'inventory') and self.player.inventory:
                     self.log("Your inventory:")
                     for i, item in enumerate(self.player.inventory, 1):
-                        self.log(f"  {i}. {item.name}: {item.description}")
+                        self.log(f"  {i}. {self.player.inventory.label(i - 1)}: {item.description}")
                     self.log("\nType 'use [item number]' or 'use [item name]' to use an item.")
                 else:
                     self.log("You don't have any items to use.")
@@ -183,7 +185,8 @@ class Combat:
 
                 # remove consumable items after use
                 if item.consumable:
-                    self.player.inventory.pop(index)
+                    self.player.inventory.remove(item)
+                self.player.inventory_changed()
                 return True
             else:
                 self.log("Invalid item index.")
@@ -198,9 +201,9 @@ class Combat:
             self.log("You don't have any items to use.")
             return False
 
-        for i, item in enumerate(self.player.inventory):
-            if item.name.lower() == name.lower():
-                return self.use_item_by_index(i)
+        index = self.player.inventory.find(name)
+        if index is not None:
+            return self.use_item_by_index(index)
 
         self.log(f"You don't have an item called '{name}'.")
         return False
@@ -240,7 +243,7 @@ class Combat:
         """Handle the enemy's turn."""
         self.log("\nIt's the enemy's turn!")
         # enemies occasionally use special attacks for variety
-        attack_type = "special" if rd.random() < 0.2 else "normal"  # 30% chance for a special attack
+        attack_type = "special" if self.rng.random() < 0.2 else "normal"  # 30% chance for a special attack
         self.attack(self.enemy, self.player, attack_type)
 
     def attempt_flee(self):
@@ -250,7 +253,7 @@ class Combat:
         :return: True if the flee chance is 50% or higher, False otherwise.
         """
         # flee chance is affected by relative strength of combatants
-        flee_chance = rd.random()
+        flee_chance = self.rng.random()
         player_strength = self.player.health  # using player health as strength for now
         enemy_strength = self.enemy.health  # same for the enemy
 
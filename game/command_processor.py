@@ -1,93 +1,224 @@
-from .commands import examine, help_command, show_regions, show_enemies, show_inventory, use_item
-from .combat import Combat
+from functools import lru_cache
 
+from .commands import (examine, help_command, look_around, show_odds, show_regions, show_enemies, show_inventory,
+                       use_item)
+
+# verb -> handler(game_engine, noun); filled in once at import by the @command decorator below
+COMMANDS = {}
+
+# every spelling a player may type for a verb: the verb itself, its aliases and unique prefixes
+_VERBS = {}
+
+# in-combat actions, abbreviated the same way
+COMBAT_ACTIONS = ("attack", "special", "use", "flee")
+
+# verbs that only report on the game; everything else is snapshotted first so it can be undone
+READ_ONLY_VERBS = frozenset(("help", "look", "regions", "enemies", "examine", "stats", "inventory", "odds"))
+
+
+def command(verb, *aliases):
+    """Register a handler for a verb and any aliases it should also answer to."""
+    def register(handler):
+        COMMANDS[verb] = handler
+        _VERBS[verb] = verb
+        for alias in aliases:
+            _VERBS[alias] = verb
+        return handler
+    return register
 
-def process_command(command_str, game_engine):
-    """Process a command string and execute the corresponding action."""
-    if not command_str:
-        return "Please enter a command."
 
+def _add_prefixes(spellings, verbs):
+    """Map every prefix that only one of ``verbs`` starts with to that verb."""
+    owners = {}
+    for verb in verbs:
+        for end in range(1, len(verb)):
+            owners.setdefault(verb[:end], set()).add(verb)
+    for prefix, matches in owners.items():
+        if len(matches) == 1 and prefix not in spellings:
+            spellings[prefix] = matches.pop()
+
+
+@lru_cache(maxsize=1024)
+def parse_command(command_str):
+    """Split a command into its handler and noun, resolving aliases and abbreviations."""
     words = command_str.strip().lower().split()
-    verb = words[0]
+    if not words:
+        return _empty, None
+
+    verb = _VERBS.get(words[0])
     noun = ' '.join(words[1:]) if len(words) > 1 else None
+    if verb is None:
+        return _unknown, None
+    return COMMANDS[verb], noun
 
-    # command handling uses a dictionary for easy extensibility
-    command_handlers = {
-        "help": lambda: help_command(),
-        "regions": lambda: _show_regions(game_engine),
-        "travel": lambda: _handle_travel(game_engine, noun),
-        "look": lambda: _handle_look(game_engine),
-        "enemies": lambda: _show_enemies(game_engine),
-        "examine": lambda: _handle_examine(noun),
-        "stats": lambda: _show_stats(game_engine),
-        "inventory": lambda: _show_inventory(game_engine),
-        "use": lambda: _handle_use_item(game_engine, noun),
-        "attack": lambda: _handle_attack(game_engine, noun),
-        "encounter": lambda: _handle_encounter(game_engine),
-    }
-
-    # execute the command if it exists
-    if verb in command_handlers:
-        return command_handlers[verb]()
-    else:
-        return "Unknown command. Type 'help' for a list of commands."
 
+@lru_cache(maxsize=1024)
+def command_verb(command_str):
+    """Return the verb a command resolves to, or None if it is not a known command."""
+    words = command_str.strip().lower().split()
+    return _VERBS.get(words[0]) if words else None
 
-# functions with empty string returns are printing directly
-# this pattern allows flexible output handling
 
-def _show_regions(game_engine):
-    regions_text = show_regions(game_engine.world)
-    print(regions_text)
-    return ""  # Return empty string since we printed directly
+@lru_cache(maxsize=1024)
+def parse_combat_command(command_str):
+    """Turn a combat command into an ``(action, item)`` pair for GameEngine.process_combat_action.
 
+    ``item`` is a zero-based inventory index, an item name or None.
+    """
+    words = command_str.strip().lower().split()
+    if not words:
+        return "", None
 
-def _handle_travel(game_engine, region_name):
-    if not region_name:
-        return "Travel where? Type 'regions' to see available regions."
+    action = _COMBAT_VERBS.get(words[0], command_str.strip().lower())
+    if action != "use":
+        return action, None
+
+    param = ' '.join(words[1:])
+    if not param or param == "item":
+        return "use item", None
+    try:
+        return "use item", int(param) - 1  # convert to zero-based index
+    except ValueError:
+        return "use item", param
+
+
+class ResponseCache:
+    """Rendered command output per verb, reused until the state version it was built from moves on.
+
+    Fully static output (help, the region listing) is built once per process in
+    commands.py; this covers output that depends on one session's world or inventory.
+    """
+    __slots__ = ("_entries",)
+
+    def __init__(self):
+        self._entries = {}  # verb -> (version, text)
 
-    # region changes are handled by the world object
-    result = game_engine.world.change_region(region_name)
+    def get(self, verb, version, build):
+        """Return the cached text for ``verb`` at ``version``, rendering it with ``build`` if stale."""
+        entry = self._entries.get(verb)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        text = build()
+        self._entries[verb] = (version, text)
+        return text
+
+
+def process_command(command_str, game_engine):
+    """Process a command string, execute the corresponding action and write its output."""
+    if game_engine.in_combat:
+        result = run_combat_command(command_str, game_engine)
+        for message in result.get("log", []):
+            game_engine.output.write(message)
+        return ""
+
+    handler, noun = parse_command(command_str or "")
+    if command_verb(command_str or "") in READ_ONLY_VERBS or handler in (_empty, _unknown, _undo):
+        result = handler(game_engine, noun)
+    else:
+        game_engine.remember()
+        result = handler(game_engine, noun)
+    if result:
+        game_engine.output.write(result)
     return result
 
 
-def _handle_look(game_engine):
+def run_combat_command(command_str, game_engine):
+    """Run one combat action and return the combat state from GameEngine.process_combat_action."""
+    # a few commands also work mid-fight without costing the player their turn
+    handler = parse_command(command_str or "")[0]
+    if handler in (_undo, _odds):
+        message = handler(game_engine, None)
+        state = game_engine.get_current_combat_state() or {"active": False}
+        return {**state, "log": [message]}
+
+    action, item = parse_combat_command(command_str)
+    game_engine.remember()
+    return game_engine.process_combat_action(action, item)
+
+
+# handlers with empty string returns have already written to the engine output
+
+def _empty(game_engine, noun):
+    return "Please enter a command."
+
+
+def _unknown(game_engine, noun):
+    return "Unknown command. Type 'help' for a list of commands."
+
+
+@command("help", "?")
+def _show_help(game_engine, noun):
+    return help_command()
+
+
+@command("look", "l")
+def _handle_look(game_engine, noun):
     # quick environment summary without entering detailed examination
-    return f"You are currently in the {game_engine.world.current_region}.\n" \
-           f"There are {len(game_engine.world.enemies)} enemies in this area."
+    world = game_engine.world
+    return game_engine.responses.get("look", world.version, lambda: look_around(world))
 
 
-def _show_enemies(game_engine):
-    enemies_text = show_enemies(game_engine.world)
-    print(enemies_text)
+@command("regions")
+def _show_regions(game_engine, noun):
+    return show_regions(game_engine.world)
+
+
+@command("travel", "go")
+def _handle_travel(game_engine, region_name):
+    if not region_name:
+        return "Travel where? Type 'regions' to see available regions."
+
+    # region changes are handled by the world object, which reports to the engine output
+    game_engine.world.change_region(region_name)
     return ""
 
 
-def _handle_examine(noun):
+@command("enemies")
+def _show_enemies(game_engine, noun):
+    world = game_engine.world
+    return game_engine.responses.get("enemies", world.version, lambda: show_enemies(world))
+
+
+@command("examine", "x")
+def _handle_examine(game_engine, noun):
     if not noun:
         return "Examine what?"
-    return examine(noun)
+    return examine(game_engine.world, noun)
 
 
-def _show_stats(game_engine):
+@command("stats")
+def _show_stats(game_engine, noun):
     return game_engine.player.show_stats()
 
 
-def _show_inventory(game_engine):
-    inventory_text = show_inventory(game_engine.player)
-    print(inventory_text)
-    return ""
+@command("inventory", "i")
+def _show_inventory(game_engine, noun):
+    player = game_engine.player
+    return game_engine.responses.get("inventory", player.inventory_version, lambda: show_inventory(player))
 
 
+@command("use")
 def _handle_use_item(game_engine, item_identifier):
     if not item_identifier:
         return "Use what? Specify an item number or name."
 
     # player can use items by name or inventory position
-    result = use_item(game_engine.player, item_identifier)
-    return result
+    return use_item(game_engine.player, item_identifier)
+
+
+@command("undo")
+def _undo(game_engine, noun):
+    return game_engine.undo()
+
+
+@command("odds")
+def _odds(game_engine, noun):
+    if not game_engine.in_combat or not game_engine.active_combat:
+        return "You are not in combat."
+    return show_odds(game_engine.active_combat)
 
 
+@command("attack")
 def _handle_attack(game_engine, target_name):
     if not target_name:
         return "Attack what? Specify an enemy name."
@@ -97,23 +228,24 @@ def _handle_attack(game_engine, target_name):
     if not enemy:
         return f"No enemy named '{target_name}' found."
 
-    # terminal mode
-    print(f"{game_engine.player.name} initiates combat with {enemy.name}!")
-    combat = Combat(game_engine.player, enemy)
-    combat.start_combat()
-
-    return ""  # combat system handles its own output
+    game_engine.output.write(f"{game_engine.player.name} initiates combat with {enemy.name}!")
+    return _start_combat(game_engine, enemy.name)
 
 
-def _handle_encounter(game_engine):
+@command("encounter")
+def _handle_encounter(game_engine, noun):
     # random enemy encounters add unpredictability to gameplay
-    enemy = game_engine.world.encounter_enemy()
-    if not enemy:
+    if not game_engine.world.enemies:
         return "No enemies to encounter."
+    return _start_combat(game_engine, None)
+
+
+def _start_combat(game_engine, enemy_name):
+    for message in game_engine.start_combat(enemy_name)["log"]:
+        game_engine.output.write(message)
+    return ""  # combat system handles its own output
 
-    # terminal mode
-    print(f"{game_engine.player.name} encounters {enemy.name}!")
-    combat = Combat(game_engine.player, enemy)
-    combat.start_combat()
 
-    return ""  # combat system handles its own output
\ No newline at end of file
+_add_prefixes(_VERBS, list(COMMANDS))
+_COMBAT_VERBS = {action: action for action in COMBAT_ACTIONS}
+_add_prefixes(_COMBAT_VERBS, COMBAT_ACTIONS)
@@ -1,94 +1,17 @@
-from .characters import Character
-from .world import GameObject
-from .items import Item
-
-
-def process_command(command, game_engine):
-    """Process a user command and return the result."""
-    if not command:
-        return "Please enter a command."
-
-    words = command.strip().lower().split()
-    verb = words[0]
-    noun = ' '.join(words[1:]) if len(words) > 1 else None
-
-    if verb == "help":
-        return help_command()
-
-    elif verb == "look":
-        return look_around(game_engine.world)
-
-    elif verb == "regions":
-        return show_regions(game_engine.world)
-
-    elif verb == "travel" and noun:
-        return travel(game_engine.world, noun)
-    elif verb == "travel":
-        return "Travel where? Type 'regions' to see available destinations."
-
-    elif verb == "enemies":
-        return show_enemies(game_engine.world)
-
-    elif verb == "examine" and noun:
-        return examine(noun)
-    elif verb == "examine":
-        return "Examine what?"
-
-    elif verb == "attack" and noun:
-        enemy = game_engine.world.get_enemy_by_name(noun)
-        if enemy:
-            from .combat import Combat
-            print(f"{game_engine.player.name} initiates combat with {enemy.name}!")
-            combat = Combat(game_engine.player, enemy)
-            combat.start_combat()
-            return ""
-        else:
-            return f"No enemy named '{noun}' found."
-    elif verb == "attack":
-        return "Attack what? Specify an enemy name."
-
-    elif verb == "encounter":
-        enemy = game_engine.world.encounter_enemy()
-        if enemy:
-            from .combat import Combat
-            print(f"{game_engine.player.name} encounters {enemy.name}!")
-            combat = Combat(game_engine.player, enemy)
-            combat.start_combat()
-            return ""
-        else:
-            return "No enemies to encounter."
-
-    elif verb == "stats":
-        return show_stats(game_engine.player)
-
-    elif verb == "inventory":
-        return show_inventory(game_engine.player)
-
-    elif verb == "use" and noun:
-        return use_item(game_engine.player, noun)
-    elif verb == "use":
-        return "Use what? Specify an item number or name."
+from functools import lru_cache
 
-    else:
-        return "Unknown command. Type 'help' for a list of commands."
+from .odds import combat_odds
+from .world import REGIONS
 
 
-def examine(noun):
-    """Returns the description of an object or character in the game."""
-    noun = noun.lower()
-    if noun in GameObject.objects:
-        return GameObject.objects[noun].get_desc()
+def examine(world, noun):
+    """Returns the description of an object or character in the given world."""
+    obj = world.find_object(noun)
+    if obj is not None:
+        return obj.get_desc()
     return "There is nothing special here."
 
 
-def attack(player, noun):
-    """Handles attacking an NPC or character in the game."""
-    noun = noun.lower()
-    if noun in GameObject.objects and isinstance(GameObject.objects[noun], Character):
-        return player.attack(GameObject.objects[noun])
-    return "You cannot attack that!"
-
-
 def show_stats(player):
     """Display character statistics."""
     return player.show_stats()
@@ -104,7 +27,7 @@ def show_inventory(player):
         equipped = ""
         if hasattr(item, 'equipped') and item.equipped:
             equipped = " (equipped)"
-        inventory_text += f"  {i}. {item.name}{equipped}: {item.description}\n"
+        inventory_text += f"  {i}. {player.inventory.label(i - 1)}{equipped}: {item.description}\n"
 
     return inventory_text.strip()
 
@@ -117,30 +40,40 @@ def use_item(player, item_name_or_num):
     try:
         # check if the parameter is a number
         item_index = int(item_name_or_num) - 1
-        if 0 <= item_index < len(player.inventory):
-            item = player.inventory[item_index]
-            result = item.use(player)
-            if item.consumable:
-                player.inventory.pop(item_index)
-            return result
-        else:
-            return f"Invalid item number. You have {len(player.inventory)} items."
     except ValueError:
-        # if not a number, search by name
-        for item in player.inventory:
-            if item.name.lower() == item_name_or_num.lower():
-                result = item.use(player)
-                if item.consumable:
-                    player.inventory.remove(item)
-                return result
-        return f"No item named '{item_name_or_num}' found in your inventory."
+        # if not a number, look it up by name
+        item_index = player.inventory.find(item_name_or_num)
+        if item_index is None:
+            return f"No item named '{item_name_or_num}' found in your inventory."
+    else:
+        if not 0 <= item_index < len(player.inventory):
+            return f"Invalid item number. You have {len(player.inventory)} items."
+
+    item = player.inventory[item_index]
+    result = item.use(player)
+    if item.consumable:
+        player.inventory.remove(item)
+    player.inventory_changed()
+    return result
 
 
 def show_regions(world):
     """Display all available regions."""
+    if world.regions is REGIONS:
+        return _region_listing(world.current_region)
+    return _render_regions(world.regions, world.current_region)
+
+
+@lru_cache(maxsize=None)
+def _region_listing(current_region):
+    # the shared region table never changes, so one listing per region serves every world
+    return _render_regions(REGIONS, current_region)
+
+
+def _render_regions(regions, current_region):
     regions_text = "Available regions:\n"
-    for region in world.regions.keys():
-        if region == world.current_region:
+    for region in regions.keys():
+        if region == current_region:
             regions_text += f"  {region} (current)\n"
         else:
             regions_text += f"  {region}\n"
@@ -159,6 +92,15 @@ def show_enemies(world):
     return enemies_text.strip()
 
 
+def show_odds(combat):
+    """Display the exact chances of the current fight."""
+    odds = combat_odds(combat)
+    return (f"Your odds against {combat.enemy.name} ({combat.enemy.health}/{combat.enemy.max_health} HP): "
+            f"{odds['win']:.1%} to win with the best moves.\n"
+            f"  attack: {odds['attack']:.1%}, special: {odds['special']:.1%}, "
+            f"chance to flee: {odds['flee']:.0%}")
+
+
 def look_around(world):
     """Look around the current region."""
     look_text = f"You are currently in the {world.current_region}.\n"
@@ -166,28 +108,27 @@ def look_around(world):
     return look_text
 
 
-def travel(world, destination):
-    """Travel to a new region."""
-    if destination.lower() in world.regions:
-        world.change_region(destination.lower())
-        return f"You have traveled to the {destination}."
-    else:
-        return f"Invalid region: {destination}. Staying in {world.current_region}."
+# the help text never changes, so it is put together once at import
+HELP_TEXT = "\n".join([
+    "Available commands:",
+    "  help - Display this help message.",
+    "  look - Look around your current location.",
+    "  regions - Show available regions to travel to.",
+    "  travel [region] - Travel to a different region.",
+    "  enemies - Show enemies in your current region.",
+    "  examine [object] - Examine an object or character more closely.",
+    "  attack [enemy] - Attack a specific enemy to start combat.",
+    "  encounter - Find a random enemy to battle.",
+    "  stats - Display your character's statistics.",
+    "  inventory - Display your inventory.",
+    "  use [item/number] - Use an item from your inventory.",
+    "  undo - Take back your last turn.",
+    "  odds - Show your chances in the current fight.",
+    "  quit - Exit the game.",
+    "Commands can be shortened to any unique prefix, such as 'inv' or 'enc'.",
+])
 
 
 def help_command():
     """Display available commands."""
-    commands_text = "Available commands:\n"
-    commands_text += "  help - Display this help message.\n"
-    commands_text += "  look - Look around your current location.\n"
-    commands_text += "  regions - Show available regions to travel to.\n"
-    commands_text += "  travel [region] - Travel to a different region.\n"
-    commands_text += "  enemies - Show enemies in your current region.\n"
-    commands_text += "  examine [object] - Examine an object or character more closely.\n"
-    commands_text += "  attack [enemy] - Attack a specific enemy to start combat.\n"
-    commands_text += "  encounter - Find a random enemy to battle.\n"
-    commands_text += "  stats - Display your character's statistics.\n"
-    commands_text += "  inventory - Display your inventory.\n"
-    commands_text += "  use [item/number] - Use an item from your inventory.\n"
-    commands_text += "  quit - Exit the game."
-    return commands_text
\ No newline at end of file
+    return HELP_TEXT
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""Game content (races, regions, loot and starting items) read from the JSON files in game/data.
+
+content.json holds the races, the loot table, the starting items and the names
+of the regions; each region's enemies live in regions/<name>.json and are only
+read the first time that region is used. Everything is validated as it is
+read and kept in immutable tables shared by every world in the process, so
+adding regions costs nothing per session.
+"""
+import json
+import os
+import re
+import threading
+from collections import namedtuple
+from collections.abc import Mapping
+from functools import lru_cache
+from types import MappingProxyType
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+RaceStats = namedtuple("RaceStats", "health attack_power defense")
+EnemyType = namedtuple("EnemyType", "race description")
+ItemSpec = namedtuple("ItemSpec", "kind name description amount")
+LootEntry = namedtuple("LootEntry", "kind low high item")
+BonusItem = namedtuple("BonusItem", "chance item")
+StartingItems = namedtuple("StartingItems", "items bonus")
+
+# fields an item may set, per kind; items.build_item turns each kind into its class
+ITEM_FIELDS = {
+    "healing_potion": ("name", "description", "amount"),
+    "damage_potion": ("name", "description", "amount"),
+    "strength_elixir": ("name", "amount"),
+    "defense_potion": ("name", "amount"),
+    "weapon": ("name", "description", "amount"),
+    "armor": ("name", "description", "amount"),
+    "luck_charm": ("name", "description"),
+}
+# kinds whose class has no default name or description
+NAMED_KINDS = ("weapon", "armor")
+
+# region names double as file names, so keep them to plain words
+REGION_NAME = re.compile(r"^[a-z][a-z0-9_-]*$")
+
+
+class ContentError(ValueError):
+    """A content file is missing something or holds a value the game cannot use."""
+
+
+def _check(condition, source, message):
+    if not condition:
+        raise ContentError(f"{source}: {message}")
+
+
+def _integer(data, key, source, minimum, default=None):
+    value = data.get(key, default)
+    # bool is an int too, but never what a content author meant
+    _check(isinstance(value, int) and not isinstance(value, bool) and value >= minimum,
+           source, f"'{key}' must be a whole number of at least {minimum}")
+    return value
+
+
+def _object(data, source):
+    _check(isinstance(data, dict), source, "expected an object")
+    return data
+
+
+def _list(data, key, source):
+    value = data.get(key)
+    _check(isinstance(value, list) and value, source, f"'{key}' must be a non-empty list")
+    return value
+
+
+def _read(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except OSError as e:
+        raise ContentError(f"{path}: cannot be read ({e.strerror})") from None
+    except ValueError as e:
+        raise ContentError(f"{path}: not valid JSON ({e})") from None
+
+
+def _item(data, source, placeholders=None, amount=True):
+    """Validate one item and return its ItemSpec.
+
+    ``placeholders`` are the ``{names}`` its name and description may use, and
+    ``amount=False`` leaves the amount to whoever builds it (loot rolls its own).
+    """
+    _object(data, source)
+    kind = data.get("kind")
+    _check(kind in ITEM_FIELDS, source, f"unknown item kind {kind!r}")
+    allowed = ITEM_FIELDS[kind] if amount else tuple(f for f in ITEM_FIELDS[kind] if f != "amount")
+    unknown = set(data) - set(allowed) - {"kind"}
+    _check(not unknown, source, f"{kind} items do not take {', '.join(sorted(unknown))}")
+    if kind in NAMED_KINDS:
+        _check("name" in data and "description" in data, source, f"{kind} items need a name and a description")
+
+    for key in ("name", "description"):
+        if key in data:
+            _check(isinstance(data[key], str) and data[key], source, f"'{key}' must be a non-empty string")
+            try:
+                data[key].format(**(placeholders or {}))
+            except (KeyError, IndexError, ValueError):
+                names = ", ".join(f"{{{name}}}" for name in placeholders or ()) or "no placeholders"
+                raise ContentError(f"{source}: '{key}' may only use {names}") from None
+
+    item_amount = _integer(data, "amount", source, 1) if "amount" in data else None
+    return ItemSpec(kind, data.get("name"), data.get("description"), item_amount)
+
+
+class Regions(Mapping):
+    """Region name -> tuple of EnemyType, reading each region's file on first use.
+
+    Listing the regions or checking whether one exists never touches their files.
+    """
+
+    def __init__(self, directory, names, races):
+        self._directory = directory
+        self._names = tuple(names)
+        self._known = frozenset(names)
+        self._races = races
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        enemy_types = self._loaded.get(name)
+        if enemy_types is None:
+            if name not in self._known:
+                raise KeyError(name)
+            with self._lock:
+                enemy_types = self._loaded.get(name)
+                if enemy_types is None:
+                    enemy_types = self._loaded[name] = self._load(name)
+        return enemy_types
+
+    def __contains__(self, name):
+        return name in self._known
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def _load(self, name):
+        path = os.path.join(self._directory, "regions", f"{name}.json")
+        data = _object(_read(path), path)
+        enemy_types = []
+        for i, enemy in enumerate(_list(data, "enemies", path)):
+            source = f"{path}: enemies[{i}]"
+            _object(enemy, source)
+            _check(enemy.get("race") in self._races, source, f"unknown race {enemy.get('race')!r}")
+            _check(isinstance(enemy.get("description"), str) and enemy["description"], source,
+                   "'description' must be a non-empty string")
+            enemy_types.append(EnemyType(enemy["race"], enemy["description"]))
+        return tuple(enemy_types)
+
+
+class Content:
+    """Every table of one content directory; regions are read lazily, the rest right away."""
+
+    def __init__(self, directory=DATA_DIR):
+        self.directory = directory
+        path = os.path.join(directory, "content.json")
+        data = _object(_read(path), path)
+
+        races = {}
+        for race, stats in _object(data.get("races"), f"{path}: races").items():
+            source = f"{path}: races.{race}"
+            _object(stats, source)
+            races[race] = RaceStats(_integer(stats, "health", source, 1), _integer(stats, "attack_power", source, 1),
+                                    _integer(stats, "defense", source, 0, default=0))
+        _check(races, path, "'races' must not be empty")
+        self.races = MappingProxyType(races)
+
+        names = _list(data, "regions", path)
+        for name in names:
+            _check(isinstance(name, str) and REGION_NAME.match(name), path, f"bad region name {name!r}")
+        _check(len(set(names)) == len(names), path, "region names must be unique")
+        self.regions = Regions(directory, names, self.races)
+
+        loot = []
+        for i, entry in enumerate(_list(data, "loot", path)):
+            source = f"{path}: loot[{i}]"
+            _object(entry, source)
+            item = _item({key: value for key, value in entry.items() if key not in ("low", "high")}, source,
+                         placeholders={"race": "Orc"}, amount=False)
+            _check("amount" in ITEM_FIELDS[item.kind], source, f"{item.kind} items have no amount to roll")
+            low = _integer(entry, "low", source, 1)
+            high = _integer(entry, "high", source, low)
+            loot.append(LootEntry(item.kind, low, high, item))
+        # enemies carry their loot as (kind, amount), so each kind may only appear once
+        _check(len({entry.kind for entry in loot}) == len(loot), path, "each loot kind may only appear once")
+        self.loot = tuple(loot)
+
+        starting = _object(data.get("starting_items"), f"{path}: starting_items")
+        items = tuple(_item(item, f"{path}: starting_items.items[{i}]")
+                      for i, item in enumerate(_list(starting, "items", f"{path}: starting_items")))
+        bonus = []
+        for i, entry in enumerate(starting.get("bonus", ())):
+            source = f"{path}: starting_items.bonus[{i}]"
+            _object(entry, source)
+            chance = entry.get("chance")
+            _check(isinstance(chance, (int, float)) and not isinstance(chance, bool) and 0 <= chance <= 1,
+                   source, "'chance' must be between 0 and 1")
+            bonus.append(BonusItem(chance, _item(entry.get("item"), f"{source}.item")))
+        _check(sum(entry.chance for entry in bonus) <= 1 + 1e-9, path, "bonus item chances add up to more than 1")
+        self.starting_items = StartingItems(items, tuple(bonus))
+
+
+@lru_cache(maxsize=None)
+def load_content(directory=DATA_DIR):
+    """Return the Content of a directory, read once per process."""
+    return Content(directory)
@@ -0,0 +1,87 @@
+import random as rd
+import threading
+import time
+from collections import deque
+
+from .world import REGIONS, generate_population
+
+
+class EnemyPool:
+    """Ready-made enemy populations per region, kept topped up by a background thread.
+
+    ``take`` hands out a population in O(1) so travelling does not have to build
+    five enemies inside the request. Each population is handed out once and then
+    belongs to the world that took it. Populations come from the pool's own
+    generator, so sessions that must replay exactly from their seed should
+    build their own instead.
+    """
+
+    def __init__(self, regions=REGIONS, depth=4, refill_rate=200.0, seed=None):
+        self.regions = regions
+        self.depth = depth
+        self.refill_rate = refill_rate  # populations built per second at most
+        self.rng = rd.Random(seed)
+        self._ready = {region: deque() for region in regions}
+        self._wake = threading.Event()
+        self._thread = None
+
+    def take(self, region):
+        """Return a ready population for a region, or None if there is none right now."""
+        ready = self._ready.get(region)
+        if ready is None:
+            return None
+        try:
+            population = ready.popleft()
+        except IndexError:
+            population = None
+        self._wake.set()
+        return population
+
+    def ready(self, region):
+        """Number of populations waiting for a region."""
+        return len(self._ready.get(region, ()))
+
+    def fill(self):
+        """Build populations until every region is at full depth."""
+        while self._refill_one():
+            pass
+
+    def start(self):
+        """Fill the pool, then keep refilling it on a daemon thread."""
+        self.fill()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="enemy-pool", daemon=True)
+            self._thread.start()
+        return self
+
+    def _refill_one(self):
+        # top up the emptiest region first so heavy traffic to one region cannot starve the others
+        region = min(self._ready, key=lambda name: len(self._ready[name]))
+        if len(self._ready[region]) >= self.depth:
+            return False
+        self._ready[region].append(generate_population(self.regions[region], self.rng))
+        return True
+
+    def _run(self):
+        pause = 1 / self.refill_rate if self.refill_rate > 0 else 0
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            while self._refill_one():
+                time.sleep(pause)
+
+
+_shared_pool = None
+
+
+def start_shared_pool(depth=4, refill_rate=200.0):
+    """Start the process-wide pool that worlds take populations from; depth 0 leaves it off."""
+    global _shared_pool
+    if _shared_pool is None and depth > 0:
+        _shared_pool = EnemyPool(depth=depth, refill_rate=refill_rate).start()
+    return _shared_pool
+
+
+def shared_pool():
+    """Return the process-wide pool, or None if it was never started."""
+    return _shared_pool
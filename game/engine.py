@@ -1,42 +1,69 @@
+import random as rd
+from collections import deque
+
 from .characters import Orc, Elf, Human
-from .commands import process_command, help_command, show_regions, show_enemies, show_inventory, use_item
+from .command_processor import ResponseCache, process_command
 from .world import World
 from .items import create_starting_items
 from .combat import Combat
+from .enemy_pool import shared_pool
+from .output import ConsoleOutput, OutputBuffer
+from .snapshot import CountingRandom, Snapshotter, restore
+
+# how many turns a player can take back
+UNDO_DEPTH = 10
 
 
 class GameEngine:
     """Manages the game loop and user commands."""
 
-    def __init__(self):
+    def __init__(self, output=None, seed=None):
+        # everything the game has to say goes through this sink instead of stdout
+        self.output = output if output is not None else ConsoleOutput()
+        # one generator per session; keeping the seed lets the whole session be replayed
+        self.seed = seed if seed is not None else rd.randrange(2 ** 32)
+        self.rng = CountingRandom(self.seed)
+        # sessions started from a chosen seed build their own enemies so they replay exactly
+        self.seeded = seed is not None
         self.running = True
         self.player = None
         self.world = None
         self.in_combat = False
         self.active_combat = None
+        # rendered look/enemies/inventory output, valid until the world or inventory version changes
+        self.responses = ResponseCache()
+        # snapshots taken before each state-changing command, newest last; a command that changed
+        # nothing leaves one equal to the current state, which undo skips
+        self.history = deque(maxlen=UNDO_DEPTH)
+        self._snapshotter = Snapshotter()
 
     def start_game(self):
         """Initialize the game and start the main game loop."""
         self._setup_player()
         self._give_starting_items()
 
-        print(f"You are {self.player.name}, {self.player.description}")
-        print(f"You've been equipped with {len(self.player.inventory)} starter items.")
-        print("Type 'help' for commands.")
+        self.output.write(f"You are {self.player.name}, {self.player.description}")
+        self.output.write(f"You've been equipped with {len(self.player.inventory)} starter items.")
+        self.output.write("Type 'help' for commands.")
 
-        self.world = World(self.player)
+        self.world = World(self.player, output=self.output, rng=self.rng, enemy_pool=self.enemy_pool)
         self.game_loop()
 
+    @property
+    def enemy_pool(self):
+        """The pool this session's world may take ready-made enemies from, if any."""
+        return None if self.seeded else shared_pool()
+
     def _setup_player(self):
         """Create the player character based on user input."""
-        print("Welcome to the Lands of Mordor!")
+        self.output.write("Welcome to the Lands of Mordor!")
 
         while True:
             name = input("Enter your character name: ").strip()
             if len(name) > 256:
-                print("Name is too long. Please keep your name under 256 characters.")
+                self.output.write("Name is too long. Please keep your name under 256 characters.")
             elif not name:
-                print("You must enter a name.")
+                self.output.write("You must enter a name.")
             else:
                 break
 
@@ -49,12 +76,12 @@ class GameEngine:
         elif race == "human":
             self.player = Human(name)
         else:
-            print("Invalid race. Defaulting to Human.")
+            self.output.write("Invalid race. Defaulting to Human.")
             self.player = Human(name)
 
     def _give_starting_items(self):
         """Give the player their starting inventory items."""
-        starting_items = create_starting_items()
+        starting_items = create_starting_items(self.rng)
         for item in starting_items:
             self.player.add_item(item)
 
@@ -65,18 +92,16 @@ class GameEngine:
 
             # special case for quit command
             if command == "quit":
-                print("Goodbye, traveler!")
+                self.output.write("Goodbye, traveler!")
                 self.running = False
                 continue
 
-            # process all other commands through the command processor
-            result = process_command(command, self)
-            if result:
-                print(result)
+            # process all other commands through the command processor, which writes to our output
+            process_command(command, self)
 
             # check if player died during command execution
             if not self.player.is_alive():
-                print("Game over! Your character has been defeated.")
+                self.output.write("Game over! Your character has been defeated.")
                 self.running = False
 
     def start_combat(self, enemy_name=None):
@@ -93,7 +118,7 @@ class GameEngine:
                 return {"error": "No enemy found", "log": ["No enemies to encounter in this region."]}
 
         # create combat instance
-        self.active_combat = Combat(self.player, enemy)
+        self.active_combat = Combat(self.player, enemy, self.rng)
         self.in_combat = True
 
         # start the combat and return initial state
@@ -116,17 +141,60 @@ class GameEngine:
 
         # check if combat is over
         if not result["active"]:
+            defeated = self.active_combat.enemy
             self.in_combat = False
             self.active_combat = None
 
             # handle rewards if player won
             if result.get("victory"):
-                reward_msg = self.world.give_reward(self.player)
+                reward_msg = self.world.give_reward(self.player, self.world.get_enemy_for(defeated))
                 if reward_msg:
                     result["log"].append(reward_msg)
 
         return result
 
+    def snapshot(self):
+        """Return an immutable Snapshot of the player, world, combat and dice.
+
+        Records of objects that did not change since the last snapshot are
+        shared, so keeping many snapshots only costs what changed between them.
+        """
+        return self._snapshotter.take(self)
+
+    def restore(self, snapshot):
+        """Put this engine back into the state a snapshot recorded."""
+        restore(self, snapshot)
+        self.responses = ResponseCache()
+
+    def fork(self, snapshot=None, output=None):
+        """Return a new engine that continues from a snapshot, by default the current state."""
+        engine = GameEngine(output=output if output is not None else OutputBuffer(), seed=self.seed)
+        engine.seeded = self.seeded
+        engine.restore(snapshot if snapshot is not None else self.snapshot())
+        return engine
+
+    def remember(self):
+        """Snapshot the state before a state-changing command so undo can go back to it.
+
+        Only one snapshot is taken per command. If the previous command
+        changed nothing, its entry equals this one and is reused; comparing
+        the two is cheap, since unchanged records are the same objects.
+        """
+        if not self.history.maxlen:
+            return
+        snapshot = self.snapshot()
+        if not self.history or self.history[-1] != snapshot:
+            self.history.append(snapshot)
+
+    def undo(self):
+        """Take back the last state-changing command and return a message saying so."""
+        if self.history and self.history[-1] == self.snapshot():
+            self.history.pop()  # the last command changed nothing, so take back the one before it
+        if not self.history:
+            return "There is nothing to undo."
+        self.restore(self.history.pop())
+        return "You retrace your steps. The last turn is undone."
+
     def get_current_combat_state(self):
         """Get the current state of combat if in combat."""
         if not self.in_combat or not self.active_combat:
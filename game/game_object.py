@@ -1,11 +1,30 @@
 class GameObject:
-    """Base class for all objects in the game."""
-    objects = {}
+    """Base class for all objects in the game.
+
+    Objects are not tracked globally; each World finds the objects a player can
+    refer to by name through its own indexes. Instances use slots, and subclasses
+    whose text only depends on their type leave ``_description`` unset and
+    build it on demand in ``default_description``.
+    """
+    __slots__ = ("name", "_description", "__weakref__")
 
     def __init__(self, name, description):
         self.name = name
-        self.description = description
-        GameObject.objects[self.name.lower()] = self
+        self._description = description
+
+    @property
+    def description(self):
+        """The object's own description, or the shared one for its kind."""
+        if self._description is None:
+            return self.default_description()
+        return self._description
+
+    @description.setter
+    def description(self, value):
+        self._description = value
+
+    def default_description(self):
+        return ""
 
     def get_desc(self):
         return self.description
@@ -0,0 +1,126 @@
+from .items import item_fields
+
+# slots a character can fill; a stack of identical consumables takes one
+INVENTORY_SLOTS = 10
+
+
+def stack_key(item):
+    """Key shared by items that may stack: consumables of one class with identical stats.
+
+    Equipment never stacks, since each piece is equipped on its own.
+    """
+    if not item.consumable:
+        return None
+    return (type(item), item.name, item._description) + tuple(getattr(item, field, None)
+                                                              for field in item_fields(type(item)))
+
+
+class Inventory:
+    """A character's items in numbered slots, with identical consumables stacked into one slot.
+
+    Indexing, iterating and ``len`` work on slots and give the top item of
+    each, so slot ``i`` is line ``i + 1`` of the inventory listing and of
+    ``use N``. A slot keeps its number while its stack shrinks; once it
+    empties, the slots after it close up, as lines of the listing would.
+    Names, stacks and the slot of every item are indexed, so lookups never
+    scan the slots.
+    """
+    __slots__ = ("capacity", "_slots", "_by_name", "_by_key", "_slot_of")
+
+    def __init__(self, items=(), capacity=INVENTORY_SLOTS):
+        self.capacity = capacity
+        self._slots = []  # one list of items per slot, the top of the stack last
+        self._by_name = {}  # lowercase name -> first slot holding it
+        self._by_key = {}  # stack_key -> slot of that stack
+        self._slot_of = {}  # item -> its slot
+        # restored inventories keep every item they had, even past capacity
+        for item in items:
+            self._put(item)
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __iter__(self):
+        for stack in self._slots:
+            yield stack[-1]
+
+    def __getitem__(self, index):
+        return self._slots[index][-1]
+
+    def __contains__(self, item):
+        return item in self._slot_of
+
+    def count(self, index):
+        """Number of items stacked in a slot."""
+        return len(self._slots[index])
+
+    def label(self, index):
+        """Name of the item in a slot, with the stack size if there is more than one."""
+        stack = self._slots[index]
+        return f"{stack[-1].name} x{len(stack)}" if len(stack) > 1 else stack[-1].name
+
+    def items(self):
+        """Every item, slot by slot, stacked ones included."""
+        return [item for stack in self._slots for item in stack]
+
+    def find(self, name):
+        """Slot of the first item with this name, ignoring case, or None."""
+        return self._by_name.get(name.lower())
+
+    def slot_of(self, item):
+        """Slot holding this very item, or None."""
+        return self._slot_of.get(item)
+
+    def add(self, item):
+        """Add an item, stacking it if it can; returns False if it needs a new slot and none is free."""
+        if stack_key(item) not in self._by_key and len(self._slots) >= self.capacity:
+            return False
+        self._put(item)
+        return True
+
+    def remove(self, item):
+        """Take an item out; returns False if it is not here."""
+        index = self._slot_of.pop(item, None)
+        if index is None:
+            return False
+        stack = self._slots[index]
+        if stack[-1] is item:
+            stack.pop()
+        else:
+            stack.remove(item)
+        if not stack:
+            del self._slots[index]
+            self._reindex()
+        return True
+
+    def stacks(self):
+        """``(top item, count)`` per slot, in slot order."""
+        return [(stack[-1], len(stack)) for stack in self._slots]
+
+    def summary(self):
+        """``[name, count]`` per slot, in slot order: what a client needs to show and number the inventory."""
+        return [[stack[-1].name, len(stack)] for stack in self._slots]
+
+    def _put(self, item):
+        key = stack_key(item)
+        index = self._by_key.get(key) if key is not None else None
+        if index is None:
+            index = len(self._slots)
+            self._slots.append([])
+            self._by_name.setdefault(item.name.lower(), index)
+            if key is not None:
+                self._by_key[key] = index
+        self._slots[index].append(item)
+        self._slot_of[item] = index
+
+    def _reindex(self):
+        # only needed when a slot disappears and the ones after it move up
+        self._by_name, self._by_key, self._slot_of = {}, {}, {}
+        for index, stack in enumerate(self._slots):
+            top = stack[-1]
+            self._by_name.setdefault(top.name.lower(), index)
+            key = stack_key(top)
+            if key is not None:
+                self._by_key[key] = index
+            for item in stack:
+                self._slot_of[item] = index
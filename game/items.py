@@ -1,9 +1,12 @@
 import random as rd
+from functools import lru_cache
+from .content import load_content
 from .game_object import GameObject
 
 
 class Item(GameObject):
     """Base class for all items in the game."""
+    __slots__ = ("value", "consumable", "equipped")
 
     def __init__(self, name, description, value=0, consumable=False):
         super().__init__(name, description)
@@ -18,6 +21,7 @@ class Item(GameObject):
 
 class Consumable(Item):
     """Base class for consumable items."""
+    __slots__ = ()
 
     def __init__(self, name, description, value=10):
         super().__init__(name, description, value=value, consumable=True)
@@ -25,6 +29,7 @@ class Consumable(Item):
 
 class Equipment(Item):
     """Base class for equipment items."""
+    __slots__ = ()
 
     def __init__(self, name, description, value=30):
         super().__init__(name, description, value=value, consumable=False)
@@ -42,17 +47,19 @@ class Equipment(Item):
 
 class HealingPotion(Consumable):
     """A potion that heals the user."""
+    __slots__ = ("healing_amount",)
 
-    def __init__(self, name="Healing Potion", description="A red potion that restores health.", healing_amount=None):
+    def __init__(self, name="Healing Potion", description=None, healing_amount=None, rng=None):
         if healing_amount is None:
-            healing_amount = rd.randint(5, 15)
-
-        if description == "A red potion that restores health.":
-            description = f"A red potion that restores {healing_amount} HP."
+            healing_amount = (rng or rd).randint(5, 15)
 
+        # without a description of its own the potion describes itself from its amount
         super().__init__(name, description, value=healing_amount * 2)
         self.healing_amount = healing_amount
 
+    def default_description(self):
+        return f"A red potion that restores {self.healing_amount} HP."
+
     def use(self, user, target=None):
         """Heal the user by the healing amount."""
         original_health = user.health
@@ -63,17 +70,18 @@ class HealingPotion(Consumable):
 
 class DamagePotion(Consumable):
     """A potion that damages the target."""
+    __slots__ = ("damage_amount",)
 
-    def __init__(self, name="Damage Potion", description="A volatile mixture in a glass vial.", damage_amount=None):
+    def __init__(self, name="Damage Potion", description=None, damage_amount=None, rng=None):
         if damage_amount is None:
-            damage_amount = rd.randint(8, 12)
-
-        if description == "A volatile mixture in a glass vial.":
-            description = f"A volatile mixture that deals {damage_amount} damage when thrown."
+            damage_amount = (rng or rd).randint(8, 12)
 
         super().__init__(name, description, value=damage_amount * 2)
         self.damage_amount = damage_amount
 
+    def default_description(self):
+        return f"A volatile mixture that deals {self.damage_amount} damage when thrown."
+
     def use(self, user, target=None):
         """Deal damage to the target."""
         if target is None:
@@ -87,40 +95,47 @@ class DamagePotion(Consumable):
 
 class StrengthElixir(Consumable):
     """Temporarily boosts attack power."""
+    __slots__ = ("boost_amount", "duration")
 
-    def __init__(self, name="Strength Elixir", boost_amount=None, duration=3):
+    def __init__(self, name="Strength Elixir", boost_amount=None, duration=3, rng=None):
         if boost_amount is None:
-            boost_amount = rd.randint(2, 4)
+            boost_amount = (rng or rd).randint(2, 4)
 
-        description = f"A powerful brew that increases attack by {boost_amount} for {duration} turns."
-        super().__init__(name, description, value=boost_amount * 10)
+        super().__init__(name, None, value=boost_amount * 10)
         self.boost_amount = boost_amount
         self.duration = duration
 
+    def default_description(self):
+        return f"A powerful brew that increases attack by {self.boost_amount} for {self.duration} turns."
+
     def use(self, user, target=None):
-        user._attack_power += self.boost_amount
+        user.attack_power = user._attack_power + self.boost_amount
         return f"{user.name} drinks the {self.name}, feeling stronger! Attack +{self.boost_amount}."
 
 
 class DefensePotion(Consumable):
     """Temporarily boosts defense."""
+    __slots__ = ("boost_amount", "duration")
 
-    def __init__(self, name="Defense Potion", boost_amount=None, duration=3):
+    def __init__(self, name="Defense Potion", boost_amount=None, duration=3, rng=None):
         if boost_amount is None:
-            boost_amount = rd.randint(1, 3)
+            boost_amount = (rng or rd).randint(1, 3)
 
-        description = f"A thick, metallic liquid that increases defense by {boost_amount} for {duration} turns."
-        super().__init__(name, description, value=boost_amount * 10)
+        super().__init__(name, None, value=boost_amount * 10)
         self.boost_amount = boost_amount
         self.duration = duration
 
+    def default_description(self):
+        return f"A thick, metallic liquid that increases defense by {self.boost_amount} for {self.duration} turns."
+
     def use(self, user, target=None):
-        user._defense += self.boost_amount
+        user.defense = user._defense + self.boost_amount
         return f"{user.name} drinks the {self.name}, feeling more resilient! Defense +{self.boost_amount}."
 
 
 class Weapon(Equipment):
     """A weapon that can be equipped to increase attack power."""
+    __slots__ = ("attack_bonus",)
 
     def __init__(self, name, description, attack_bonus=2):
         super().__init__(name, description, value=attack_bonus * 25)
@@ -150,6 +165,7 @@ class Weapon(Equipment):
 
 class Armor(Equipment):
     """Armor that can be equipped to absorb damage."""
+    __slots__ = ("defense_bonus",)
 
     def __init__(self, name, description, defense_bonus=2):
         super().__init__(name, description, value=defense_bonus * 20)
@@ -179,6 +195,7 @@ class Armor(Equipment):
 
 class LuckCharm(Equipment):
     """Increases critical hit chance when equipped."""
+    __slots__ = ("crit_bonus",)
 
     def __init__(self, name="Lucky Charm", description="A small trinket that seems to bring good fortune."):
         super().__init__(name, description, value=40)
@@ -202,26 +219,61 @@ class LuckCharm(Equipment):
             return f"{user.name} wears the {self.name}, feeling luckier!"
 
 
-def create_starting_items():
-    """Create a set of starting items for a new player."""
-    items = [
-        HealingPotion(),
-        Weapon("Rusty Sword", "An old sword with some rust, but still sharp.", 1),
-        Armor("Leather Tunic", "Basic protection made of hardened leather.", 1)
-    ]
-
-    # add one random bonus item based on chance
-    bonus_roll = rd.random()
-
-    if bonus_roll < 0.2:  # 20% chance for a good weapon
-        items.append(Weapon("Steel Shortsword", "A well-crafted blade of decent quality.", 2))
-    elif bonus_roll < 0.4:  # 20% chance for good armor
-        items.append(Armor("Studded Leather", "Reinforced leather armor offering better protection.", 2))
-    elif bonus_roll < 0.6:  # 20% chance for a strength elixir
-        items.append(StrengthElixir())
-    elif bonus_roll < 0.8:  # 20% chance for a defense potion
-        items.append(DefensePotion())
-    else:  # 20% chance for a luck charm
-        items.append(LuckCharm())
-
-    return items
\ No newline at end of file
+@lru_cache(maxsize=None)
+def item_fields(cls):
+    """Slots an item class adds on top of GameObject, in a stable order."""
+    fields = []
+    for klass in reversed(cls.__mro__):
+        if klass is not GameObject and issubclass(klass, GameObject):
+            fields.extend(klass.__dict__.get("__slots__", ()))
+    return tuple(fields)
+
+
+# item class and the keyword it takes its amount as, per content item kind
+ITEM_KINDS = {
+    "healing_potion": (HealingPotion, "healing_amount"),
+    "damage_potion": (DamagePotion, "damage_amount"),
+    "strength_elixir": (StrengthElixir, "boost_amount"),
+    "defense_potion": (DefensePotion, "boost_amount"),
+    "weapon": (Weapon, "attack_bonus"),
+    "armor": (Armor, "defense_bonus"),
+    "luck_charm": (LuckCharm, None),
+}
+
+
+def build_item(spec, rng=None, amount=None, **placeholders):
+    """Build the item a content ItemSpec describes.
+
+    ``amount`` overrides the spec's own; without either, consumables roll theirs
+    with rng. ``{placeholders}`` in the name and description are filled in.
+    """
+    cls, amount_keyword = ITEM_KINDS[spec.kind]
+    kwargs = {}
+    if spec.name is not None:
+        kwargs["name"] = spec.name.format(**placeholders)
+    if spec.description is not None:
+        kwargs["description"] = spec.description.format(**placeholders)
+    amount = amount if amount is not None else spec.amount
+    if amount is not None:
+        kwargs[amount_keyword] = amount
+    if issubclass(cls, Consumable):
+        kwargs["rng"] = rng
+    return cls(**kwargs)
+
+
+def create_starting_items(rng=None):
+    """Create a set of starting items for a new player, rolling with rng if given."""
+    rng = rng or rd
+    starting_items = load_content().starting_items
+    items = [build_item(spec, rng) for spec in starting_items.items]
+
+    # add at most one bonus item, each with its own chance
+    bonus_roll = rng.random()
+    threshold = 0.0
+    for bonus in starting_items.bonus:
+        threshold += bonus.chance
+        if bonus_roll < threshold:
+            items.append(build_item(bonus.item, rng))
+            break
+
+    return items
@@ -0,0 +1,114 @@
+"""Exact odds of winning a fight under the rules of Combat.
+
+A fight is a small Markov chain over (player HP, enemy HP) at the start of the
+player's turn: the player attacks normally or specially, the enemy strikes back
+(a special attack 20% of the time), and either may crit for double damage.
+Every attack deals at least one damage, so enemy HP only ever goes down and the
+chain can be solved bottom-up, exactly. Items are not part of the model.
+"""
+from functools import lru_cache
+
+CRIT_CHANCE = 0.2  # same as Combat.attack
+ENEMY_SPECIAL_CHANCE = 0.2  # same as Combat.enemy_turn
+SPECIAL_BONUS = (1, 2, 3)  # extra damage of a special attack, rolled uniformly
+
+
+@lru_cache(maxsize=None)
+def damage_distribution(attack_power, special=False):
+    """Return ``((damage, probability), ...)`` for one Combat.attack."""
+    attack_power = max(1, attack_power)
+    dist = {}
+    for roll in range(1, attack_power + 1):
+        for damage, chance in ((roll, 1 - CRIT_CHANCE), (roll * 2, CRIT_CHANCE)):
+            chance /= attack_power
+            if special:
+                for bonus in SPECIAL_BONUS:
+                    dist[damage + bonus] = dist.get(damage + bonus, 0.0) + chance / len(SPECIAL_BONUS)
+            else:
+                dist[damage] = dist.get(damage, 0.0) + chance
+    return tuple(sorted(dist.items()))
+
+
+@lru_cache(maxsize=None)
+def enemy_distribution(attack_power):
+    """Damage distribution of an enemy turn, which mixes normal and special attacks."""
+    dist = {}
+    for special, weight in ((False, 1 - ENEMY_SPECIAL_CHANCE), (True, ENEMY_SPECIAL_CHANCE)):
+        for damage, chance in damage_distribution(attack_power, special):
+            dist[damage] = dist.get(damage, 0.0) + chance * weight
+    return tuple(sorted(dist.items()))
+
+
+def flee_chance(player_health, enemy_health):
+    """Chance that Combat.attempt_flee succeeds."""
+    if player_health > enemy_health:
+        return 0.7
+    if player_health < enemy_health:
+        return 0.3
+    return 0.5
+
+
+# each entry holds three (max HP + 1)^2 tables, about 1MB at 100 HP each, so only the latest few are kept
+@lru_cache(maxsize=32)
+def win_tables(player_attack, enemy_attack, player_max_health, enemy_max_health):
+    """Solve one matchup for every pair of hit points; the result is cached per matchup.
+
+    Returns ``(attack, special, defend)`` tables indexed ``[player_hp][enemy_hp]``:
+    the chance to win after opening the player's turn with a normal or a special
+    attack and playing on optimally, and the chance to win when it is the
+    enemy's turn to strike.
+    """
+    normal = damage_distribution(player_attack)
+    special = damage_distribution(player_attack, special=True)
+    enemy = enemy_distribution(enemy_attack)
+
+    rows, columns = player_max_health + 1, enemy_max_health + 1
+    attack = [[0.0] * columns for _ in range(rows)]
+    special_attack = [[0.0] * columns for _ in range(rows)]
+    defend = [[0.0] * columns for _ in range(rows)]
+
+    # the player's attack always lowers enemy HP, so solving column by column only looks back
+    for e in range(1, columns):
+        for p in range(1, rows):
+            for table, dist in ((attack, normal), (special_attack, special)):
+                total = 0.0
+                for damage, chance in dist:
+                    total += chance if damage >= e else chance * defend[p][e - damage]
+                table[p][e] = total
+
+        # the enemy's blow only lowers player HP, and every best move at this enemy HP is now known
+        for p in range(1, rows):
+            defend[p][e] = sum(chance * max(attack[p - damage][e], special_attack[p - damage][e])
+                               for damage, chance in enemy if damage < p)
+
+    return attack, special_attack, defend
+
+
+def fight_odds(player_health, enemy_health, player_attack, enemy_attack, player_max_health=None,
+               enemy_max_health=None, turn="player"):
+    """Return the chances of a fight as plain data.
+
+    ``win`` assumes best play from here on; ``attack`` and ``special`` are the
+    chances after opening with that move, and ``flee`` is the chance that
+    running away works. With ``turn="enemy"`` the enemy strikes first, and
+    with ``turn="start"`` the coin flip of Combat.determine_turn_order decides.
+    """
+    player_max_health = max(player_health, player_max_health or player_health)
+    enemy_max_health = max(enemy_health, enemy_max_health or enemy_health)
+    attack, special, defend = win_tables(player_attack, enemy_attack, player_max_health, enemy_max_health)
+
+    p, e = max(0, player_health), max(0, enemy_health)
+    if p == 0 or e == 0:
+        win = 1.0 if e == 0 and p > 0 else 0.0
+        return {"win": win, "attack": win, "special": win, "flee": 0.0}
+
+    player_first = max(attack[p][e], special[p][e])
+    win = {"player": player_first, "enemy": defend[p][e], "start": (player_first + defend[p][e]) / 2}[turn]
+    return {"win": win, "attack": attack[p][e], "special": special[p][e], "flee": flee_chance(p, e)}
+
+
+def combat_odds(combat):
+    """Odds of an ongoing Combat, from the player's point of view."""
+    player, enemy = combat.player, combat.enemy
+    return fight_odds(player.health, enemy.health, player.attack_power, enemy.attack_power,
+                      player.max_health, enemy.max_health, combat.turn_order)
@@ -0,0 +1,25 @@
+class OutputBuffer:
+    """Collects the messages a game engine produces until a caller drains them.
+
+    Every engine owns its own buffer, so several sessions can run side by side
+    without fighting over ``sys.stdout``.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    def write(self, message):
+        """Add a message to the buffer."""
+        self.messages.append(str(message))
+
+    def drain(self):
+        """Return all buffered messages and start over with an empty buffer."""
+        messages, self.messages = self.messages, []
+        return messages
+
+
+class ConsoleOutput(OutputBuffer):
+    """Output for the terminal version: messages are printed as soon as they are written."""
+
+    def write(self, message):
+        print(message)
@@ -0,0 +1,76 @@
+"""Put engines, characters and items back together from saved values.
+
+Shared by game.state, which reads JSON saves, and game.snapshot, which reads
+undo records, so both build exactly the same objects. Objects are made with
+``__new__`` and filled in directly, since their constructors would roll dice
+or hand out fresh starting stats.
+"""
+from .combat import Combat
+from .game_object import GameObject
+from .inventory import Inventory
+from .world import World, Enemy
+
+# a character's equipment, in the order saves and records list it
+EQUIPMENT_SLOTS = ("equipped_weapon", "equipped_armor", "equipped_charm")
+NOTHING_EQUIPPED = (None, None, None)
+
+
+def restore_item(cls, name, description, fields):
+    """Build an item of ``cls`` from its name, its own description (or None) and ``(field, value)`` pairs."""
+    item = cls.__new__(cls)
+    GameObject.__init__(item, name, description)
+    for field, value in fields:
+        setattr(item, field, value)
+    return item
+
+
+def restore_character(cls, name, description, race, health, max_health, attack_power, defense, items,
+                      equipped=NOTHING_EQUIPPED):
+    """Build a character of ``cls`` holding ``items``.
+
+    ``equipped`` gives the weapon, armor and charm as positions in ``items``, or None.
+    """
+    character = cls.__new__(cls)
+    GameObject.__init__(character, name, description)
+    character.race = race
+    character._health = health
+    character._max_health = max_health
+    character._attack_power = attack_power
+    character._defense = defense
+    character.stats_version = 0
+    character.inventory = Inventory(items)
+    character.inventory_version = 0
+    for slot, index in zip(EQUIPMENT_SLOTS, equipped):
+        setattr(character, slot, items[index] if index is not None else None)
+    return character
+
+
+def restore_enemy(name, description, character, loot):
+    """Build an enemy around an already rebuilt character, with the ``(kind, amount)`` loot it has yet to drop."""
+    enemy = Enemy.__new__(Enemy)
+    GameObject.__init__(enemy, name, description)
+    enemy.character = character
+    enemy.loot = list(loot)
+    return enemy
+
+
+def restore_world(engine, region, enemies):
+    """Give the engine a world in ``region`` holding ``enemies``, wired to the engine's player, output and dice."""
+    world = World(engine.player, current_region=region, populate=False,
+                  output=engine.output, rng=engine.rng, enemy_pool=engine.enemy_pool)
+    for enemy in enemies:
+        world.add_enemy(enemy)
+    engine.world = world
+
+
+def restore_combat(engine, enemy, turn_order, combat_active):
+    """Put the engine's player in an ongoing fight with the ``enemy`` character."""
+    combat = Combat.__new__(Combat)
+    combat.player = engine.player
+    combat.enemy = enemy
+    combat.rng = engine.rng
+    combat.turn_order = turn_order
+    combat.combat_log = []
+    combat.combat_active = combat_active
+    engine.active_combat = combat
+    engine.in_combat = True
@@ -0,0 +1,175 @@
+import argparse
+
+import numpy as np
+
+from .characters import Orc, Elf, Human
+
+# base (health, attack power) per race, taken from the Orc/Elf/Human templates
+RACE_STATS = {
+    cls.template.race.lower(): (cls.template.health, cls.template.attack_power)
+    for cls in (Orc, Elf, Human)
+}
+
+CRIT_CHANCE = 0.2  # same as Combat.attack
+ENEMY_SPECIAL_CHANCE = 0.2  # same as Combat.enemy_turn
+
+
+class SimulationResult:
+    """Aggregated outcome of a batch of simulated fights."""
+
+    def __init__(self, player_race, enemy_race, weapon_bonus, armor_bonus, fights, wins, losses,
+                 turn_counts, hp_remaining):
+        self.player_race = player_race
+        self.enemy_race = enemy_race
+        self.weapon_bonus = weapon_bonus
+        self.armor_bonus = armor_bonus
+        self.fights = fights
+        self.wins = wins
+        self.losses = losses
+        self.turn_counts = turn_counts  # turn_counts[t] = fights that lasted t player turns
+        self.hp_remaining = hp_remaining  # hp_remaining[hp] = won fights the player finished with hp left
+
+    @property
+    def win_rate(self):
+        return self.wins / self.fights if self.fights else 0.0
+
+    @property
+    def mean_turns(self):
+        turns = np.arange(len(self.turn_counts))
+        return float((turns * self.turn_counts).sum() / self.fights) if self.fights else 0.0
+
+    def summary(self):
+        """Return the result as plain data, e.g. for JSON output."""
+        return {
+            "player_race": self.player_race,
+            "enemy_race": self.enemy_race,
+            "weapon_bonus": self.weapon_bonus,
+            "armor_bonus": self.armor_bonus,
+            "fights": self.fights,
+            "wins": self.wins,
+            "losses": self.losses,
+            "win_rate": self.win_rate,
+            "mean_turns": self.mean_turns,
+            "turn_counts": self.turn_counts.tolist(),
+            "hp_remaining": self.hp_remaining.tolist(),
+        }
+
+
+def _strike(rng, attack_power, special):
+    """Roll the damage of one Combat.attack for every fight in the batch at once."""
+    count = len(special)
+    damage = rng.integers(1, attack_power + 1, size=count)
+    damage[rng.random(count) < CRIT_CHANCE] *= 2
+    damage[special] += rng.integers(1, 4, size=int(special.sum()))
+    return damage
+
+
+def _simulate_batch(rng, count, player_stats, enemy_stats, player_special, max_turns):
+    player_health, player_attack = player_stats
+    enemy_health, enemy_attack = enemy_stats
+
+    player_hp = np.full(count, player_health, dtype=np.int64)
+    enemy_hp = np.full(count, enemy_health, dtype=np.int64)
+    turns = np.zeros(count, dtype=np.int64)
+
+    # the coin flip in Combat.determine_turn_order lets the enemy open half the fights
+    opening = np.flatnonzero(rng.random(count) < 0.5)
+    special = rng.random(len(opening)) < ENEMY_SPECIAL_CHANCE
+    player_hp[opening] = np.maximum(0, player_hp[opening] - _strike(rng, enemy_attack, special))
+
+    active = np.flatnonzero(player_hp > 0)
+    player_specials = np.full(count, player_special)
+    # every unfinished fight advances in lockstep, one player turn per pass
+    for _ in range(max_turns):
+        if not active.size:
+            break
+        turns[active] += 1
+        damage = _strike(rng, player_attack, player_specials[:active.size])
+        enemy_hp[active] = np.maximum(0, enemy_hp[active] - damage)
+
+        active = active[enemy_hp[active] > 0]
+        special = rng.random(active.size) < ENEMY_SPECIAL_CHANCE
+        player_hp[active] = np.maximum(0, player_hp[active] - _strike(rng, enemy_attack, special))
+
+        active = active[player_hp[active] > 0]
+
+    return player_hp, enemy_hp, turns
+
+
+def simulate(player_race, enemy_race, fights, weapon_bonus=0, armor_bonus=0, player_action="attack",
+             seed=None, max_turns=1000, batch_size=1_000_000):
+    """Simulate many independent fights between a player and an enemy at once.
+
+    Every fight follows the rules of Combat: a coin flip decides who opens, each
+    attack deals ``randint(1, attack_power)`` with a 20% chance to double, special
+    attacks add ``randint(1, 3)``, and the enemy uses a special 20% of the time.
+    The player always takes ``player_action`` ("attack" or "special") and fights
+    to the end. Combat.attack ignores defense, so ``armor_bonus`` is recorded
+    but, just like in a real fight, does not change the outcome.
+    """
+    player_race, enemy_race = player_race.lower(), enemy_race.lower()
+    if player_action not in ("attack", "special"):
+        raise ValueError(f"Unknown player action: {player_action}")
+
+    player_health, player_attack = RACE_STATS[player_race]
+    player_stats = (player_health, player_attack + weapon_bonus)
+    enemy_stats = RACE_STATS[enemy_race]
+
+    rng = np.random.default_rng(seed)
+    wins = losses = 0
+    turn_counts = np.zeros(max_turns + 1, dtype=np.int64)
+    hp_remaining = np.zeros(player_health + 1, dtype=np.int64)
+
+    for start in range(0, fights, batch_size):
+        count = min(batch_size, fights - start)
+        player_hp, enemy_hp, turns = _simulate_batch(rng, count, player_stats, enemy_stats,
+                                                     player_action == "special", max_turns)
+        won = (enemy_hp == 0) & (player_hp > 0)
+        wins += int(won.sum())
+        losses += int((player_hp == 0).sum())
+        turn_counts += np.bincount(turns, minlength=max_turns + 1)
+        hp_remaining += np.bincount(player_hp[won], minlength=player_health + 1)
+
+    # trim the long empty tail of the turn distribution
+    last_turn = np.flatnonzero(turn_counts)
+    turn_counts = turn_counts[:last_turn[-1] + 1] if last_turn.size else turn_counts[:1]
+
+    return SimulationResult(player_race, enemy_race, weapon_bonus, armor_bonus, fights, wins, losses,
+                            turn_counts, hp_remaining)
+
+
+def matchup_table(fights, weapon_bonus=0, armor_bonus=0, player_action="attack", seed=None):
+    """Simulate every race against every other race and return the results."""
+    rng = np.random.default_rng(seed)
+    return [
+        simulate(player_race, enemy_race, fights, weapon_bonus, armor_bonus, player_action,
+                 seed=rng.integers(2 ** 63))
+        for player_race in RACE_STATS
+        for enemy_race in RACE_STATS
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate fights in bulk to tune race and item balance.")
+    parser.add_argument("player_race", nargs="?", choices=list(RACE_STATS), help="omit to simulate every matchup")
+    parser.add_argument("enemy_race", nargs="?", choices=list(RACE_STATS))
+    parser.add_argument("-n", "--fights", type=int, default=1_000_000)
+    parser.add_argument("--weapon", type=int, default=0, help="weapon attack bonus for the player")
+    parser.add_argument("--armor", type=int, default=0, help="armor defense bonus for the player")
+    parser.add_argument("--action", choices=["attack", "special"], default="attack")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    if args.player_race and args.enemy_race:
+        results = [simulate(args.player_race, args.enemy_race, args.fights, args.weapon, args.armor,
+                            args.action, seed=args.seed)]
+    else:
+        results = matchup_table(args.fights, args.weapon, args.armor, args.action, seed=args.seed)
+
+    for result in results:
+        print(f"{result.player_race:>5} vs {result.enemy_race:<5}  win rate {result.win_rate:6.1%}  "
+              f"mean turns {result.mean_turns:5.2f}")
+
+
+if __name__ == "__main__":
+    main()
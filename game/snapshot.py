@@ -0,0 +1,208 @@
+import random as rd
+import struct
+import weakref
+from collections import namedtuple
+
+from .items import Item, item_fields
+from .rebuild import NOTHING_EQUIPPED, restore_character, restore_combat, restore_enemy, restore_item, restore_world
+
+# immutable records of a game's state; a record whose object did not change since the
+# previous snapshot is reused as is, so consecutive snapshots share everything but what moved
+ItemRecord = namedtuple("ItemRecord", "cls name description fields")
+CharacterRecord = namedtuple("CharacterRecord", "cls name description race health max_health attack_power "
+                                                "defense inventory equipped")
+EnemyRecord = namedtuple("EnemyRecord", "name description character loot")
+CombatRecord = namedtuple("CombatRecord", "enemy_index enemy turn_order combat_active")
+Snapshot = namedtuple("Snapshot", "running rng_position player region enemies combat")
+
+# an item's stats are fixed when it is made; whether it is equipped is all that changes afterwards
+EQUIPPED_FIELD = item_fields(Item).index("equipped")
+
+# the Mersenne Twister's 624 words and position, packed: 2.5KB instead of about 24KB as a tuple of ints
+RNG_WORDS = struct.Struct("625I")
+# words a CountingRandom may draw past its origin before the origin is read again, so restoring stays cheap
+REBASE_WORDS = 4096
+
+
+class CountingRandom(rd.Random):
+    """A random.Random that counts the 32-bit words it has drawn since a known state, its origin.
+
+    Where the dice are is then ``(origin, words, gauss_next)``, which snapshots
+    take without reading the generator's 624 words; going back there sets the
+    origin and draws the counted words again in one call. Every method of
+    random.Random draws through ``random`` (two words) or ``getrandbits``
+    (one word per 32 bits), so the rolls come out exactly as they would from
+    random.Random itself.
+    """
+
+    words = 0
+    _origin = None  # (version, packed words) the count starts from, read when first needed
+
+    def random(self):
+        self.words += 2
+        return super().random()
+
+    def getrandbits(self, k):
+        if k > 0:
+            self.words += (k + 31) // 32
+        return super().getrandbits(k)
+
+    def seed(self, *args, **kwargs):
+        super().seed(*args, **kwargs)
+        self.words, self._origin = 0, None
+
+    def setstate(self, state):
+        super().setstate(state)
+        self.words, self._origin = 0, None
+
+    def position(self):
+        """Where the generator is, as ``(origin, words, gauss_next)``."""
+        if self._origin is None or self.words > REBASE_WORDS:
+            version, words, _ = self.getstate()
+            self._origin, self.words = (version, RNG_WORDS.pack(*words)), 0
+        return self._origin, self.words, self.gauss_next
+
+    def set_position(self, position):
+        """Go back to a position returned by ``position``."""
+        origin, words, gauss_next = position
+        version, packed = origin
+        super().setstate((version, RNG_WORDS.unpack(packed), None))
+        if words:
+            super().getrandbits(32 * words)
+        self.gauss_next = gauss_next
+        self._origin, self.words = origin, words
+
+
+class Snapshotter:
+    """Takes snapshots of one engine, only visiting the parts that changed since the last one.
+
+    Characters are rebuilt into records only when their ``stats_version`` or
+    ``inventory_version`` moved, and the enemy list only when the world's
+    version or one of its enemies did. The dice are recorded by position, see
+    CountingRandom.
+    """
+
+    def __init__(self):
+        # character -> (stats_version, inventory_version, record, {id(item): (item, record)} of its inventory)
+        self._characters = weakref.WeakKeyDictionary()
+        self._enemy_records = weakref.WeakKeyDictionary()  # enemy -> its latest record
+        self._world = None
+        self._world_version = None
+        self._enemy_marks = ()  # (character, stats_version, inventory_version) per enemy of the last enemy list
+        self._enemies = ()
+
+    def character(self, character):
+        cached = self._characters.get(character)
+        if cached is not None and cached[0] == character.stats_version and cached[1] == character.inventory_version:
+            return cached[2]
+
+        if cached is not None and cached[1] == character.inventory_version:
+            inventory, equipped, items = cached[2].inventory, cached[2].equipped, cached[3]
+        else:
+            inventory, equipped, items = self.inventory(character, cached[3] if cached is not None else {})
+        record = CharacterRecord(
+            type(character), character.name, character._description, character.race, character._health,
+            character._max_health, character._attack_power, character._defense, inventory, equipped)
+        if cached is not None and cached[2] == record:
+            record = cached[2]
+        self._characters[character] = (character.stats_version, character.inventory_version, record, items)
+        return record
+
+    def inventory(self, character, previous):
+        """Records of a character's inventory, one per slot with its stack size, and where its equipment sits.
+
+        ``previous`` maps the items of the last inventory record to their records,
+        which are reused for items still there; the new map is returned as well.
+        """
+        if not character.inventory:
+            return (), NOTHING_EQUIPPED, {}
+        equipment = (character.equipped_weapon, character.equipped_armor, character.equipped_charm)
+        equipped = list(NOTHING_EQUIPPED)
+        items, stacks, position = {}, [], 0
+        # stacked items are identical by definition, so each slot is recorded once
+        for item, count in character.inventory.stacks():
+            entry = previous.get(id(item))
+            if entry is None or entry[0] is not item or entry[1].fields[EQUIPPED_FIELD] != item.equipped:
+                fields = tuple(getattr(item, field, None) for field in item_fields(type(item)))
+                entry = (item, ItemRecord(type(item), item.name, item._description, fields))
+            items[id(item)] = entry
+            stacks.append((entry[1], count))
+            # equipment never stacks, so it is the only item of its slot; record it as a position among all items
+            if item.equipped and item in equipment:
+                equipped[equipment.index(item)] = position
+            position += count
+        return tuple(stacks), tuple(equipped), items
+
+    def enemy(self, enemy):
+        character = self.character(enemy.character)
+        previous = self._enemy_records.get(enemy)
+        # loot only changes when it is dropped, which also empties the character's inventory
+        if previous is not None and previous.character is character:
+            return previous
+        record = EnemyRecord(enemy.name, enemy._description, character, tuple(enemy.loot))
+        self._enemy_records[enemy] = record
+        return record
+
+    def enemies(self, world):
+        if world is self._world and world.version == self._world_version and all(
+                character.stats_version == stats and character.inventory_version == inventory
+                for character, stats, inventory in self._enemy_marks):
+            return self._enemies
+
+        enemies = tuple(self.enemy(enemy) for enemy in world.enemies)
+        if enemies == self._enemies:
+            enemies = self._enemies
+        self._world, self._world_version, self._enemies = world, world.version, enemies
+        self._enemy_marks = tuple((enemy.character, enemy.character.stats_version, enemy.character.inventory_version)
+                                  for enemy in world.enemies)
+        return enemies
+
+    def take(self, engine):
+        """Return a Snapshot of the engine's current state."""
+        world = engine.world
+        enemies = self.enemies(world) if world is not None else ()
+
+        combat = None
+        if engine.in_combat and engine.active_combat:
+            active = engine.active_combat
+            enemy = world.get_enemy_for(active.enemy) if world is not None else None
+            index = world.enemies.index(enemy) if enemy is not None else None
+            combat = CombatRecord(index, self.character(active.enemy) if index is None else None,
+                                  active.turn_order, active.combat_active)
+
+        return Snapshot(engine.running, engine.rng.position(),
+                        self.character(engine.player) if engine.player else None,
+                        world.current_region if world is not None else None, enemies, combat)
+
+
+def restore(engine, snapshot):
+    """Rebuild the engine's player, world and combat from a snapshot, in place."""
+    engine.rng.set_position(snapshot.rng_position)
+    engine.running = snapshot.running
+    engine.player = _build_character(snapshot.player) if snapshot.player else None
+    engine.in_combat = False
+    engine.active_combat = None
+
+    engine.world = None
+    if snapshot.region is not None:
+        restore_world(engine, snapshot.region,
+                      [restore_enemy(record.name, record.description, _build_character(record.character),
+                                     record.loot) for record in snapshot.enemies])
+
+    if snapshot.combat is not None:
+        record = snapshot.combat
+        if record.enemy_index is not None:
+            enemy = engine.world.enemies[record.enemy_index].character
+        else:
+            enemy = _build_character(record.enemy)
+        restore_combat(engine, enemy, record.turn_order, record.combat_active)
+
+
+def _build_character(record):
+    items = [_build_item(item) for item, count in record.inventory for _ in range(count)]
+    return restore_character(record.cls, record.name, record.description, record.race, record.health,
+                             record.max_health, record.attack_power, record.defense, items, record.equipped)
+
+
+def _build_item(record):
+    return restore_item(record.cls, record.name, record.description, zip(item_fields(record.cls), record.fields))
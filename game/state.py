@@ -0,0 +1,170 @@
+import base64
+import sys
+
+from .characters import Character, Orc, Elf, Human
+from .items import (Item, Consumable, Equipment, HealingPotion, DamagePotion, StrengthElixir, DefensePotion,
+                    Weapon, Armor, LuckCharm, item_fields)
+from .engine import GameEngine
+from .rebuild import EQUIPMENT_SLOTS, restore_character, restore_combat, restore_enemy, restore_item, restore_world
+from .snapshot import RNG_WORDS
+
+# every concrete class that can appear in a saved game, looked up by name on load
+CHARACTER_CLASSES = {cls.__name__: cls for cls in (Character, Orc, Elf, Human)}
+ITEM_CLASSES = {cls.__name__: cls for cls in (Item, Consumable, Equipment, HealingPotion, DamagePotion,
+                                              StrengthElixir, DefensePotion, Weapon, Armor, LuckCharm)}
+
+
+def engine_to_dict(engine):
+    """Serialize a GameEngine into plain JSON-compatible data."""
+    world = engine.world
+    combat = engine.active_combat
+
+    data = {
+        "running": engine.running,
+        "seed": engine.seed,
+        "seeded": engine.seeded,
+        # the generator's exact position, so a rehydrated session rolls what the original would have
+        "rng_state": _rng_state_to_list(engine.rng.getstate()),
+        "player": character_to_dict(engine.player) if engine.player else None,
+        "world": None,
+        "combat": None,
+    }
+
+    if world:
+        data["world"] = {
+            "current_region": world.current_region,
+            "enemies": [enemy_to_dict(enemy) for enemy in world.enemies],
+        }
+
+    if engine.in_combat and combat:
+        enemy_index = next((i for i, enemy in enumerate(world.enemies) if enemy.character is combat.enemy), None)
+        data["combat"] = {
+            "enemy_index": enemy_index,
+            "enemy": character_to_dict(combat.enemy) if enemy_index is None else None,
+            "turn_order": combat.turn_order,
+            "combat_active": combat.combat_active,
+        }
+
+    return data
+
+
+def engine_from_dict(data, output=None):
+    """Rebuild a GameEngine from data produced by engine_to_dict, writing to the given output."""
+    engine = GameEngine(output=output, seed=data.get("seed"))
+    engine.seeded = data.get("seeded", True)
+    if data.get("rng_state") is not None:
+        engine.rng.setstate(_rng_state_from_list(data["rng_state"]))
+    engine.running = data["running"]
+    engine.player = character_from_dict(data["player"]) if data["player"] else None
+
+    world_data = data["world"]
+    if world_data:
+        restore_world(engine, world_data["current_region"],
+                      [enemy_from_dict(enemy_data) for enemy_data in world_data["enemies"]])
+
+    combat_data = data["combat"]
+    if combat_data:
+        if combat_data["enemy_index"] is not None:
+            enemy = engine.world.enemies[combat_data["enemy_index"]].character
+        else:
+            enemy = character_from_dict(combat_data["enemy"])
+        restore_combat(engine, enemy, combat_data["turn_order"], combat_data["combat_active"])
+
+    return engine
+
+
+def enemy_to_dict(enemy):
+    """Serialize an enemy with its character and the loot it has yet to drop."""
+    return {"name": enemy.name, "description": enemy.description, "character": character_to_dict(enemy.character),
+            "loot": [list(spec) for spec in enemy.loot]}
+
+
+def enemy_from_dict(data):
+    """Rebuild an enemy from data produced by enemy_to_dict."""
+    return restore_enemy(data["name"], sys.intern(data["description"]), character_from_dict(data["character"]),
+                         [tuple(spec) for spec in data.get("loot", [])])
+
+
+def character_to_dict(character):
+    """Serialize a character together with its inventory and equipment.
+
+    A stack of identical items is saved once with a ``count``.
+    """
+    inventory = character.inventory
+    stacks = []
+    for i, item in enumerate(inventory):
+        data = item_to_dict(item)
+        if inventory.count(i) > 1:
+            data["count"] = inventory.count(i)
+        stacks.append(data)
+
+    # position of each slot's first item, had every stacked item been saved on its own
+    first_item = [0]
+    for i in range(len(inventory)):
+        first_item.append(first_item[-1] + inventory.count(i))
+
+    def slot(item):
+        # equipment is stored as a position in the inventory so it stays the same object on load;
+        # equipment never stacks, so that is the first item of its slot
+        index = inventory.slot_of(item) if item is not None else None
+        return first_item[index] if index is not None else None
+
+    return {
+        "type": type(character).__name__,
+        "name": character.name,
+        "description": character.description,
+        "race": character.race,
+        "health": character._health,
+        "max_health": character._max_health,
+        "attack_power": character._attack_power,
+        "defense": character._defense,
+        "inventory": stacks,
+        "equipped_weapon": slot(character.equipped_weapon),
+        "equipped_armor": slot(character.equipped_armor),
+        "equipped_charm": slot(character.equipped_charm),
+    }
+
+
+def character_from_dict(data):
+    """Rebuild a character from data produced by character_to_dict."""
+    # stacks are unpacked item by item, which is also how saves from before stacking list them
+    items = [item_from_dict(item_data) for item_data in data["inventory"] for _ in range(item_data.get("count", 1))]
+    return restore_character(CHARACTER_CLASSES[data["type"]], data["name"], sys.intern(data["description"]),
+                             data["race"], data["health"], data["max_health"], data["attack_power"], data["defense"],
+                             items, [data[slot] for slot in EQUIPMENT_SLOTS])
+
+
+def item_to_dict(item):
+    """Serialize an item, keeping only the attributes its class defines."""
+    # items that describe themselves from their stats save no description of their own
+    data = {"type": type(item).__name__, "name": item.name, "description": item._description}
+    for field in item_fields(type(item)):
+        if hasattr(item, field):
+            data[field] = getattr(item, field)
+    return data
+
+
+def item_from_dict(data):
+    """Rebuild an item from data produced by item_to_dict."""
+    cls = ITEM_CLASSES[data["type"]]
+    return restore_item(cls, data["name"], data["description"],
+                        [(field, data[field]) for field in item_fields(cls) if field in data])
+
+
+def _rng_state_to_list(state):
+    """Turn a random.Random state tuple into JSON-compatible data.
+
+    The generator's words are packed and base64-encoded: about 3.3KB, against
+    7KB or so as a list of numbers.
+    """
+    version, internal_state, gauss_next = state
+    return [version, base64.b64encode(RNG_WORDS.pack(*internal_state)).decode("ascii"), gauss_next]
+
+
+def _rng_state_from_list(data):
+    """Rebuild a random.Random state tuple from data produced by _rng_state_to_list."""
+    version, internal_state, gauss_next = data
+    # saves from before packing list the words as numbers
+    if isinstance(internal_state, str):
+        internal_state = RNG_WORDS.unpack(base64.b64decode(internal_state))
+    return version, tuple(internal_state), gauss_next
@@ -1,128 +1,212 @@
 import random as rd
 from .game_object import GameObject
-from .characters import Orc, Elf, Human
-from .items import HealingPotion, DamagePotion, Weapon, Armor
+from .characters import RACE_CLASSES
+from .content import load_content
+from .inventory import Inventory
+from .items import build_item
+from .output import ConsoleOutput
+
+
+# enemy types per region and the loot enemies can drop, read from game/data and shared by every World
+REGIONS = load_content().regions
+LOOT_TABLE = load_content().loot
+LOOT_ITEMS = {entry.kind: entry.item for entry in LOOT_TABLE}
 
 
 class Enemy(GameObject):
     """Base class for all enemies in the game."""
+    __slots__ = ("character", "loot")
 
-    def __init__(self, name, description, character_class):
+    def __init__(self, name, description, character_class, rng=None):
         super().__init__(name, description)
         self.character = character_class(name)
         # give enemies some random items they might drop
-        self.setup_loot()
+        self.setup_loot(rng)
 
     def get_desc(self):
         return f"{self.description}"
 
-    def setup_loot(self):
-        """Set up potential loot drops for this enemy."""
+    def setup_loot(self, rng=None):
+        """Roll potential loot drops for this enemy.
+
+        Only a (kind, amount) spec is kept; the item itself is built by drop_loot
+        when the enemy is defeated.
+        """
+        rng = rng or rd
+        self.loot = []
         # 50% chance to have an item
-        if rd.random() < 0.5:
-            loot_options = [
-                HealingPotion(healing_amount=rd.randint(5, 15)),
-                DamagePotion(damage_amount=rd.randint(5, 12)),
-                Weapon(f"{self.character.race} Blade", f"A weapon taken from a defeated {self.character.race}.",
-                       rd.randint(1, 3)),
-                Armor(f"{self.character.race} Armor", f"Armor scavenged from a fallen {self.character.race}.",
-                      rd.randint(1, 2))
-            ]
-            self.character.inventory = [rd.choice(loot_options)]
+        if rng.random() < 0.5:
+            entry = rng.choice(LOOT_TABLE)
+            self.loot.append((entry.kind, rng.randint(entry.low, entry.high)))
+
+    def drop_loot(self):
+        """Build this enemy's loot into items and hand them over."""
+        items = self.character.inventory.items() + [self._make_item(kind, amount) for kind, amount in self.loot]
+        self.character.inventory = Inventory()
+        self.character.inventory_changed()
+        self.loot = []
+        return items
+
+    def _make_item(self, kind, amount):
+        return build_item(LOOT_ITEMS[kind], amount=amount, race=self.character.race)
+
+
+def generate_population(enemy_types, rng, size=5):
+    """Build ``size`` enemies with unique names from a region's enemy types."""
+    population = []
+    names = set()
+    available_types = list(enemy_types)
+
+    for _ in range(size):
+        if not available_types:
+            # if we've used all the types, refill
+            available_types = list(enemy_types)
+
+        if available_types:
+            # select a random enemy type and remove it from available_types
+            type_index = rng.randint(0, len(available_types) - 1)
+            race, description = available_types.pop(type_index)
+
+            # generate a unique name with race and number
+            name = f"{race}_{rng.randint(1, 100)}"
+            while name.lower() in names:
+                name = f"{race}_{rng.randint(1, 100)}"
+            names.add(name.lower())
+            population.append(Enemy(name, description, RACE_CLASSES[race], rng))
+
+    return population
 
 
 class World:
     """Represents the game world, with NPCs and enemies."""
 
-    def __init__(self, player):
-        self.enemies = []
+    def __init__(self, player, current_region="forest", populate=True, output=None, rng=None, enemy_pool=None):
+        # bumped whenever the region or its enemies change, so rendered listings can be reused
+        self.version = 0
+        self._enemies = {}  # enemy -> None, in the order they arrived; a dict so removal is O(1)
+        self._enemy_list = ()  # self._enemies as a tuple, rebuilt on first use after a change
+        self._enemy_index = {}  # lowercase name -> enemy
         self.player = player
-        self.regions = {
-            "forest": [
-                (Orc, "A wild Orc warrior with great strength, lurking in the shadows."),
-                (Orc, "An Orc with a scarred face and a fiery temper."),
-                (Orc, "A cunning Orc archer, ready to strike from a distance."),
-                (Elf, "A mysterious Elf with glowing eyes and swift feet."),
-                (Elf, "An Elf with a silver bow, capable of incredible precision."),
-                (Elf, "A graceful Elf with sharp eyes and an unyielding will."),
-            ],
-            "plains": [
-                (Human, "A wandering Human warrior, bearing the marks of many battles."),
-                (Human, "A young Human knight, eager to prove their worth."),
-                (Human, "An old, weathered Human with a hardened look."),
-                (Orc, "A lone Orc patrol, stomping through the grasslands."),
-                (Orc, "A brutish Orc carrying a massive club, ready to crush anything in its path."),
-            ],
-            "mountains": [
-                (Orc, "A tough Orc warrior with a battle axe, his skin hardened by the cold."),
-                (Orc, "A large Orc with fur-lined armor, built for mountain warfare."),
-                (Orc, "An Orc berserker, bloodthirsty and relentless."),
-                (Elf, "An agile Elf adept at mountain climbing, blending with the rocky terrain."),
-                (Elf, "A stoic Elf with a longbow, perched on a mountain peak."),
-                (Human, "A hardened Human explorer, wrapped in furs and equipped with climbing gear."),
-            ],
-        }
-        self.current_region = "forest"  # default starting region
-        self.populate_world()
+        self.output = output if output is not None else ConsoleOutput()
+        self.rng = rng or rd
+        # ready-made populations to take instead of building them on the spot; see game.enemy_pool
+        self.enemy_pool = enemy_pool
+        # region definitions are shared by every world, never copied
+        self.regions = REGIONS
+        self.current_region = current_region
+        if populate:
+            self.populate_world()
+
+    @property
+    def enemies(self):
+        """The enemies in the current region, in the order they arrived."""
+        if self._enemy_list is None:
+            self._enemy_list = tuple(self._enemies)
+        return self._enemy_list
 
     def populate_world(self):
         """Populates the world with random enemies."""
-        enemy_types = self.regions.get(self.current_region, [])
-        self.enemies = []  # clear existing enemies
-
-        available_types = enemy_types.copy()
-
-        for _ in range(5):  # generate 5 random enemies
-            if not available_types:
-                # if we've used all the types, refill
-                available_types = enemy_types.copy()
-
-            if available_types:
-                # select a random enemy type and remove it from available_types
-                type_index = rd.randint(0, len(available_types) - 1)
-                character_class, description = available_types.pop(type_index)
+        # clear existing enemies
+        self._enemies = {}
+        self._enemy_list = ()
+        self._enemy_index = {}
+        self.version += 1
+
+        population = None
+        if self.enemy_pool is not None:
+            population = self.enemy_pool.take(self.current_region)
+        if population is None:
+            population = generate_population(self.regions.get(self.current_region, []), self.rng)
+
+        for enemy in population:
+            self.add_enemy(enemy)
+
+    def add_enemy(self, enemy):
+        """Place an enemy in the current region."""
+        self._enemies[enemy] = None
+        self._enemy_list = None
+        self.version += 1
+        self._enemy_index.setdefault(enemy.name.lower(), enemy)
+
+    def remove_enemy(self, enemy):
+        """Take an enemy out of the current region."""
+        if self._enemies.pop(enemy, False) is False:
+            return
+        self._enemy_list = None
+        self.version += 1
+
+        key = enemy.name.lower()
+        if self._enemy_index.get(key) is enemy:
+            del self._enemy_index[key]
+
+    def find_object(self, name):
+        """Returns the enemy, carried item or player with the given name, or None.
+
+        Names resolve through the enemy index and the player's inventory, which
+        always reflect what is here now, so a name still finds the next object
+        carrying it after the first one is defeated or used up.
+        """
+        key = name.lower()
+        enemy = self._enemy_index.get(key)
+        if enemy is not None:
+            return enemy.character
+        player = self.player
+        if player is not None:
+            index = player.inventory.find(key)
+            if index is not None:
+                return player.inventory[index]
+            if player.name.lower() == key:
+                return player
+        return None
 
-                # generate a unique name with race and number
-                name = f"{character_class.__name__}_{rd.randint(1, 100)}"
-                self.enemies.append(Enemy(name, description, character_class))
+    def count_objects(self):
+        """Number of objects a player can refer to by name here: the player, their items and the enemies."""
+        player = self.player
+        carried = 1 + len(player.inventory.items()) if player is not None else 0
+        return carried + len(self.enemies)
 
     def change_region(self, new_region):
         """Change the player's region and re-populate the world with enemies."""
         if new_region.lower() in self.regions:
             self.current_region = new_region.lower()
-            print(f"You have entered the {new_region}!")
+            self.version += 1
+            self.output.write(f"You have entered the {new_region}!")
             self.populate_world()
         else:
-            print(f"Invalid region: {new_region}. Staying in {self.current_region}.")
+            self.output.write(f"Invalid region: {new_region}. Staying in {self.current_region}.")
 
     def get_enemy_by_name(self, name):
         """Returns an enemy object by name."""
-        for enemy in self.enemies:
-            if enemy.name.lower() == name.lower():
-                return enemy
+        return self._enemy_index.get(name.lower())
+
+    def get_enemy_for(self, character):
+        """Returns the enemy wrapping the given character, or None."""
+        enemy = self._enemy_index.get(character.name.lower())
+        if enemy is not None and enemy.character is character:
+            return enemy
         return None
 
     def encounter_enemy(self):
         """Randomly selects an enemy from the current region."""
         if self.enemies:
-            return rd.choice(self.enemies)
+            return self.rng.choice(self.enemies)
         else:
             return None
 
     def handle_victory(self, enemy):
         """Handle the aftermath of defeating an enemy."""
-        print(f"You have defeated {enemy.name}!")
+        self.output.write(f"You have defeated {enemy.name}!")
 
         # award loot if the enemy has any
-        if hasattr(enemy.character, 'inventory') and enemy.character.inventory:
-            print("You found some items!")
-            for item in enemy.character.inventory:
-                print(f"  - {item.name}: {item.description}")
+        loot = enemy.drop_loot()
+        if loot:
+            self.output.write("You found some items!")
+            for item in loot:
+                self.output.write(f"  - {item.name}: {item.description}")
                 self.player.add_item(item)
 
-    def give_reward(self, player):
-        """Give rewards after combat and return message."""
-        enemy = self.get_last_defeated_enemy()
+    def give_reward(self, player, enemy):
+        """Give rewards for the defeated enemy and return message."""
         if not enemy:
             return None
 
@@ -130,21 +214,14 @@ class World:
         reward_message.append(f"You have defeated {enemy.name}!")
 
         # award loot if the enemy has any
-        if hasattr(enemy.character, 'inventory') and enemy.character.inventory:
+        loot = enemy.drop_loot()
+        if loot:
             reward_message.append("You found some items!")
-            for item in enemy.character.inventory:
+            for item in loot:
                 reward_message.append(f"  - {item.name}: {item.description}")
                 player.add_item(item)
 
         # remove the enemy from the world
-        if enemy in self.enemies:
-            self.enemies.remove(enemy)
-
-        return "\n".join(reward_message)
+        self.remove_enemy(enemy)
 
-    def get_last_defeated_enemy(self):
-        """Get the last defeated enemy (for reward purposes)."""
-        for enemy in self.enemies:
-            if hasattr(enemy, 'character') and enemy.character.health <= 0:
-                return enemy
-        return None
\ No newline at end of file
+        return "\n".join(reward_message)
\ No newline at end of file
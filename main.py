@@ -1,7 +1,13 @@
+import argparse
+
 from game.engine import GameEngine
 
 def main():
-    game = GameEngine()
+    parser = argparse.ArgumentParser(description="Play Mordor Adventure in the terminal.")
+    parser.add_argument("--seed", type=int, help="seed the session's random rolls to replay a game exactly")
+    args = parser.parse_args()
+
+    game = GameEngine(seed=args.seed)
     game.start_game()
 
 if __name__ == "__main__":
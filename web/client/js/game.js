@@ -10,28 +10,37 @@ document.addEventListener('DOMContentLoaded', () => {
     const playerNameInput = document.getElementById('player-name-input');
     const raceSelect = document.getElementById('race-select');
 
+    const API_URL = 'http://localhost:5000/api';
+    const SOCKET_URL = 'ws://localhost:8765/ws';
+    let socket = null;
+    // decided by the first request: true once the async server answered, false to use HTTP throughout
+    let useSocket = null;
+    let nextRequestId = 1;
+    const RECONNECT_ATTEMPTS = 4;
+    // commands that only read the game, so sending them again after a dropped connection is harmless
+    const READ_ONLY_VERBS = new Set(['help', 'look', 'l', 'regions', 'enemies', 'examine', 'x', 'stats',
+                                     'inventory', 'i', 'odds']);
+
+    // last state the server sent; command replies only carry what changed since stateVersion
+    let stateVersion = null;
+    let player = {};
+
     startButton.addEventListener('click', async () => {
         const playerName = playerNameInput.value.trim() || 'Adventurer';
         const race = raceSelect.value;
         
         try {
-            const response = await fetch('http://localhost:5000/api/new_game', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({
-                    name: playerName,
-                    race: race
-                })
+            const data = await callServer('new_game', {
+                name: playerName,
+                race: race
             });
-            
-            const data = await response.json();
             gameId = data.game_id;
+            stateVersion = data.version;
+            player = { ...data.player };
             
             // update player info
-            playerNameDisplay.textContent = data.player.name;
-            updateHealthDisplay(data.player.health, data.player.max_health);
+            playerNameDisplay.textContent = player.name;
+            updateHealthDisplay(player.health, player.max_health);
             
             // switch to game screen
             startupScreen.style.display = 'none';
@@ -59,22 +68,19 @@ document.addEventListener('DOMContentLoaded', () => {
             commandInput.value = '';
             
             try {
-                const response = await fetch('http://localhost:5000/api/command', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json'
-                    },
-                    body: JSON.stringify({
-                        game_id: gameId,
-                        command: command
-                    })
+                const data = await callServer('command', {
+                    game_id: gameId,
+                    command: command,
+                    since: stateVersion
                 });
                 
-                const data = await response.json();
-                
-                // update player info
-                playerNameDisplay.textContent = data.player.name;
-                updateHealthDisplay(data.player.health, data.player.max_health);
+                // merge whatever changed into the state we already have
+                stateVersion = data.version;
+                if (data.player) {
+                    player = { ...player, ...data.player };
+                    playerNameDisplay.textContent = player.name;
+                    updateHealthDisplay(player.health, player.max_health);
+                }
                 
                 // display new messages with typewriter effect
                 typewriterEffect(output, '\n' + data.messages.join('\n'), output.textContent.length, 10);
@@ -93,7 +99,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 
                 if (data.in_combat) {
                     setTimeout(() => {
-                        if (data.player.health <= 0) {
+                        if (player.health <= 0) {
                             console.log("Delayed death detection!");
                             showGameOverScreen();
                             commandInput.disabled = true;
@@ -103,11 +109,115 @@ document.addEventListener('DOMContentLoaded', () => {
                 
             } catch (error) {
                 console.error('Error processing command:', error);
-                appendToOutput('\nError connecting to game server. Please try again.');
+                if (error.dropped) {
+                    appendToOutput("\nThe connection dropped before the server answered. Type 'look' to see whether your last command went through.");
+                } else {
+                    appendToOutput('\nError connecting to game server. Please try again.');
+                }
             }
         }
     });
 
+    // prefer one persistent WebSocket, fall back to HTTP when the async server is not running
+    function connectSocket() {
+        return new Promise((resolve) => {
+            let ws;
+            try {
+                ws = new WebSocket(SOCKET_URL);
+            } catch (error) {
+                resolve(null);
+                return;
+            }
+
+            // requests sent on this connection and not answered yet, by id
+            ws.pending = new Map();
+            ws.onopen = () => resolve(ws);
+            ws.onerror = () => resolve(null);
+            ws.onclose = () => {
+                if (socket === ws) {
+                    socket = null;
+                }
+                // the server may already have run what was in flight, so only read-only requests go out again
+                const inFlight = [...ws.pending.values()];
+                ws.pending.clear();
+                inFlight.forEach((request) => {
+                    if (isReplayable(request.action, request.body)) {
+                        sendOverSocket(request.action, request.body).then(request.resolve, request.reject);
+                    } else {
+                        const error = new Error('Connection dropped before the server answered');
+                        error.dropped = true;
+                        request.reject(error);
+                    }
+                });
+            };
+            ws.onmessage = (event) => {
+                const data = JSON.parse(event.data);
+                const request = ws.pending.get(data.id);
+                if (request) {
+                    ws.pending.delete(data.id);
+                    request.resolve(data);
+                }
+            };
+        });
+    }
+
+    function isReplayable(action, body) {
+        if (action !== 'command') {
+            return false;
+        }
+        const verb = String(body.command || '').trim().toLowerCase().split(/\s+/)[0];
+        return READ_ONLY_VERBS.has(verb);
+    }
+
+    // games started over the socket live in the async server's memory, so once it has answered
+    // every request stays on it; a dropped connection is reopened and the game resumed by its id
+    async function openSocket() {
+        for (let attempt = 0; attempt < RECONNECT_ATTEMPTS; attempt++) {
+            if (socket && socket.readyState === WebSocket.OPEN) {
+                return socket;
+            }
+            if (attempt > 0) {
+                await new Promise((resolve) => setTimeout(resolve, 250 * 2 ** attempt));
+            }
+            socket = await connectSocket();
+        }
+        if (socket && socket.readyState === WebSocket.OPEN) {
+            return socket;
+        }
+        throw new Error('Could not reconnect to the game server');
+    }
+
+    async function sendOverSocket(action, body) {
+        const ws = await openSocket();
+        return new Promise((resolve, reject) => {
+            const id = nextRequestId++;
+            ws.pending.set(id, { action: action, body: body, resolve: resolve, reject: reject });
+            ws.send(JSON.stringify({ ...body, action: action, id: id }));
+        });
+    }
+
+    async function callServer(action, body) {
+        if (useSocket === null) {
+            socket = await connectSocket();
+            useSocket = socket !== null;
+        }
+        if (useSocket) {
+            return sendOverSocket(action, body);
+        }
+        return callHttp(action, body);
+    }
+
+    async function callHttp(action, body) {
+        const response = await fetch(`${API_URL}/${action}`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(body)
+        });
+        return response.json();
+    }
+
     function showQuitScreen() {
         console.log("Showing quit screen");
 
@@ -145,8 +255,8 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     function checkForGameOver(data) {
-        console.log("Checking game over status:", data.player.health, data.game_over);
-        if (data.player.health <= 0 || data.game_over) {
+        console.log("Checking game over status:", player.health, data.game_over);
+        if (player.health <= 0 || data.game_over) {
             console.log("Game over condition detected!");
             showGameOverScreen();
             commandInput.disabled = true;
@@ -0,0 +1,122 @@
+import sys
+import os
+import json
+import asyncio
+import functools
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import game_service
+
+# every connected player costs one suspended coroutine between commands,
+# so a single process can keep thousands of idle sockets open
+
+
+async def app(scope, receive, send):
+    """ASGI entry point serving game sessions over a WebSocket at /ws and metrics at /api/metrics."""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+    elif scope['type'] == 'websocket' and scope['path'] == '/ws':
+        await game_socket(receive, send)
+    elif scope['type'] == 'websocket':
+        await send({'type': 'websocket.close', 'code': 4404})
+    elif scope['type'] == 'http' and scope['path'] == '/api/metrics':
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', b'text/plain; version=0.0.4')]})
+        await send({'type': 'http.response.body', 'body': game_service.metrics_text().encode('utf-8')})
+    else:
+        await send({'type': 'http.response.start', 'status': 404,
+                    'headers': [(b'content-type', b'text/plain')]})
+        await send({'type': 'http.response.body', 'body': b'Connect to /ws with a WebSocket client.'})
+
+
+async def lifespan(receive, send):
+    """Flush buffered session writes when the server shuts down."""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            game_service.games.store.flush()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def blocking(function, *args):
+    """Run a game_service call on the default thread pool.
+
+    Calls can block on session store I/O, journal recovery or an odds solve,
+    which would otherwise stall every other socket on the event loop.
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(function, *args))
+
+
+async def game_socket(receive, send):
+    """Serve one player connection.
+
+    Each text frame is a JSON request, one of
+    ``{"action": "new_game", "name": ..., "race": ..., "seed": ...}`` (seed optional),
+    ``{"action": "command", "command": ...}`` or
+    ``{"action": "commands", "commands": [...]}`` or ``{"action": "odds", ...}``
+    (fields as for /api/odds), and is answered with the same
+    payload the HTTP API returns. Commands apply to the game started on this
+    connection unless the request names a ``game_id``, which is how a client
+    resumes its game on a new connection after the old one dropped. An ``id``
+    field is echoed back so clients can match replies to requests.
+    """
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    await send({'type': 'websocket.accept'})
+
+    game_id = None
+    while True:
+        message = await receive()
+        if message['type'] == 'websocket.disconnect':
+            return
+
+        text = message.get('text')
+        if text is None:
+            text = (message.get('bytes') or b'').decode('utf-8', 'replace')
+
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+
+        if not isinstance(data, dict):
+            response = {'error': 'Expected a JSON object'}
+        elif data.get('action') == 'new_game':
+            response, status = await blocking(game_service.new_game, data)
+            if status == 200:
+                game_id = response['game_id']
+        elif data.get('action') == 'command':
+            requested_id = data.get('game_id', game_id)
+            response, status = await blocking(game_service.run_command, requested_id, data.get('command') or '',
+                                              data.get('since'))
+            if status == 200:
+                game_id = requested_id
+        elif data.get('action') == 'commands':
+            requested_id = data.get('game_id', game_id)
+            response, status = await blocking(game_service.run_commands, requested_id, data.get('commands'),
+                                              data.get('since'))
+            if status == 200:
+                game_id = requested_id
+        elif data.get('action') == 'odds':
+            # a described matchup is answered as is; otherwise it is this connection's fight
+            response, status = await blocking(game_service.odds,
+                                              data if 'player' in data else {'game_id': game_id, **data})
+        else:
+            response = {'error': f"Unknown action: {data.get('action')!r}"}
+
+        if isinstance(data, dict) and 'id' in data:
+            response['id'] = data['id']
+
+        await send({'type': 'websocket.send', 'text': json.dumps(response)})
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(app, host=os.environ.get('MORDOR_HOST', '127.0.0.1'),
+                port=int(os.environ.get('MORDOR_WS_PORT', 8765)))
@@ -0,0 +1,495 @@
+import logging
+import os
+
+from game.engine import GameEngine
+from game.enemy_pool import start_shared_pool
+from game.odds import combat_odds, fight_odds
+from game.command_processor import (process_command, run_combat_command, parse_combat_command, command_verb,
+                                    READ_ONLY_VERBS)
+from game.output import OutputBuffer
+import metrics
+from journal import Journal, RecordingPool, ReplayPool
+from logs import configure_logging
+from sessions import SessionManager
+from sharding import SHARD, new_game_id
+from session_store import MemorySessionStore, FileSessionStore, SQLiteSessionStore
+
+
+def create_session_store():
+    """Pick the session store backend from the MORDOR_SESSION_STORE environment variable."""
+    backend = os.environ.get('MORDOR_SESSION_STORE', 'file')
+    if backend == 'memory':
+        return MemorySessionStore()
+    if backend == 'sqlite':
+        return SQLiteSessionStore(
+            os.environ.get('MORDOR_SESSION_DB', os.path.join(os.path.dirname(__file__), 'sessions.db'))
+        )
+    return FileSessionStore(
+        os.environ.get('MORDOR_SESSION_DIR', os.path.join(os.path.dirname(__file__), 'sessions'))
+    )
+
+
+log = configure_logging()
+
+# parts of a session that responses only resend when they changed
+STATE_FIELDS = ('player', 'inventory', 'enemy', 'region')
+
+# largest health or attack power /api/odds solves for, well past anything a character reaches in play
+MAX_ODDS_STAT = 100
+# a solve takes time in proportion to player max health * enemy max health * the larger attack power,
+# so matchups past this many steps are refused (the limit solves in about a quarter of a second)
+MAX_ODDS_WORK = 200_000
+
+# most commands one /api/commands request may run; the session stays locked for the whole batch
+MAX_BATCH_COMMANDS = 100
+
+# times a request is run again on a fresh copy after another worker saved its game first
+SAVE_ATTEMPTS = 5
+
+# combat actions worth their own latency series; anything else is counted as invalid
+COMBAT_ACTION_LABELS = ('attack', 'special', 'use item', 'flee')
+
+# ready-made enemy populations so travel does not build them inside the request
+start_shared_pool(
+    depth=int(os.environ.get('MORDOR_ENEMY_POOL_DEPTH', 4)),
+    refill_rate=float(os.environ.get('MORDOR_ENEMY_POOL_RATE', 200)),
+)
+
+# store active games, hibernating idle ones into the session store
+games = SessionManager(
+    create_session_store(),
+    max_sessions=int(os.environ.get('MORDOR_MAX_SESSIONS', 500)),
+    idle_ttl=float(os.environ.get('MORDOR_SESSION_TTL', 900)),
+)
+
+# command journal for crash recovery and auditing; off unless MORDOR_JOURNAL_DIR is set
+journal = None
+if os.environ.get('MORDOR_JOURNAL_DIR'):
+    journal = Journal(
+        os.environ['MORDOR_JOURNAL_DIR'],
+        shard=SHARD,
+        snapshot_every=int(os.environ.get('MORDOR_JOURNAL_SNAPSHOT_EVERY', 50)),
+        flush_interval=float(os.environ.get('MORDOR_JOURNAL_FLUSH', 0.05)),
+        segment_bytes=int(float(os.environ.get('MORDOR_JOURNAL_SEGMENT_MB', 16)) * 1024 * 1024),
+    )
+
+
+def new_game(data):
+    """Create a new game instance and return ``(payload, status)``."""
+    if not isinstance(data, dict):
+        return {'error': 'Expected a JSON object'}, 400
+    # an explicit seed replays the same session roll for roll; random.Random takes ints and strings alike
+    seed = data.get('seed')
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, (int, str))):
+        return {'error': 'seed must be an integer or a string'}, 400
+
+    game_id = new_game_id()
+    engine = GameEngine(output=OutputBuffer(), seed=seed)
+
+    # initialize player from request data
+    name = data.get('name', 'Adventurer')
+    race = data.get('race', 'human')
+    
+    # store game state
+    game = {
+        'engine': engine,
+        'messages': ["Welcome to the Lands of Mordor!"],
+    }
+    
+    # create player based on race
+    if race == "orc":
+        from game.characters import Orc
+        engine.player = Orc(name)
+    elif race == "elf":
+        from game.characters import Elf
+        engine.player = Elf(name)
+    else:
+        from game.characters import Human
+        engine.player = Human(name)
+
+    from game.world import World
+    engine.world = World(engine.player, output=engine.output, rng=engine.rng, enemy_pool=engine.enemy_pool)
+
+    engine._give_starting_items()
+    engine.output.drain()  # setup chatter is not shown to the player
+
+    _track_changes(game)
+    games[game_id] = game
+    if journal is not None:
+        journal.snapshot(game_id, SessionManager.session_to_dict(game))
+    log.info("new game", extra={'game_id': game_id, 'race': engine.player.race, 'seed': engine.seed})
+
+    return {
+        'game_id': game_id,
+        'seed': engine.seed,
+        'player': {
+            'name': engine.player.name,
+            'race': engine.player.race,
+            'health': engine.player.health,
+            'max_health': engine.player.max_health
+        },
+        'messages': game['messages'],
+        'in_combat': False,
+        'version': game['state_version']
+    }, 200
+
+
+def run_command(game_id, command_text, since=None):
+    """Process a command in an active game and return ``(payload, status)``.
+
+    With ``since`` set to the ``version`` of an earlier response, the payload
+    only carries the player, inventory, enemy and region fields that changed
+    after it; otherwise they are all included.
+    """
+    def run(game):
+        response = _run_command(game, command_text)
+        _attach_state(game, response, since)
+        return response, [command_text]
+
+    return _run_saved(game_id, run, [command_text])
+
+
+def run_commands(game_id, commands, since=None):
+    """Process a list of commands in order and return ``(payload, status)``.
+
+    Execution stops early once the game is over. The payload holds the messages
+    of every command that ran plus a single final player and enemy state,
+    trimmed to what changed after ``since`` like in run_command.
+    """
+    if not isinstance(commands, list):
+        return {'error': 'Expected a list of commands'}, 400
+    if len(commands) > MAX_BATCH_COMMANDS:
+        return {'error': f'At most {MAX_BATCH_COMMANDS} commands per request'}, 400
+    if not all(isinstance(command_text, str) for command_text in commands):
+        return {'error': 'commands must be strings'}, 400
+
+    def run(game):
+        engine = game['engine']
+        results = []
+        response = {}
+        for command_text in commands:
+            response = _run_command(game, command_text)
+            results.append({'command': command_text, 'messages': response['messages']})
+            if response['game_over']:
+                break
+
+        batch_response = {
+            'results': results,
+            'in_combat': engine.in_combat,
+            'game_over': not engine.running or not engine.player.is_alive()
+        }
+        _attach_state(game, batch_response, since)
+        if response.get('quit'):
+            batch_response['quit'] = True
+        return batch_response, [result['command'] for result in results]
+
+    return _run_saved(game_id, run, commands)
+
+
+def _run_saved(game_id, run, commands):
+    """Run ``run(game)`` on a session and save it, returning ``(payload, status)``.
+
+    ``run`` returns the payload and the commands it ran, for the journal. If
+    another worker saved the game while it ran, the result is thrown away and
+    ``run`` starts over on their copy, so no update is lost. Requests that only
+    read the game, going by ``commands``, are not saved at all.
+    """
+    # one request at a time per session; the lock also keeps it from being hibernated meanwhile
+    with games.lock(game_id):
+        for _ in range(SAVE_ATTEMPTS):
+            game = _load_game(game_id)
+            if game is None:
+                return {'error': 'Game not found'}, 404
+
+            # read-only commands outside a fight cannot start one, so the whole request leaves the game as it was
+            read_only = not game['engine'].in_combat and all(
+                command_verb(command_text) in READ_ONLY_VERBS for command_text in commands)
+            recorder = _record_pool(game['engine'])
+            try:
+                response, ran = run(game)
+            except BaseException:
+                games.save(game_id)
+                raise
+            finally:
+                _unrecord_pool(game['engine'], recorder)
+            if read_only or games.save(game_id):
+                _journal(game_id, game, ran, recorder)
+                return response, 200
+
+        return {'error': 'Game is busy in another worker, try again'}, 409
+
+
+def odds(data):
+    """Return exact win chances and ``(payload, status)`` for a game's fight or a described matchup.
+
+    Either name a ``game_id`` that is in combat, or give ``player`` and ``enemy``
+    objects with ``health``, ``attack_power`` and optionally ``max_health``,
+    plus an optional ``turn`` of ``player``, ``enemy`` or ``start`` (the default,
+    a fight about to begin).
+    """
+    if not isinstance(data, dict):
+        return {'error': 'Expected a JSON object'}, 400
+
+    if data.get('game_id') is not None:
+        with games.lock(data['game_id']):
+            game = _load_game(data['game_id'])
+            if game is None:
+                return {'error': 'Game not found'}, 404
+            engine = game['engine']
+            if not engine.in_combat or not engine.active_combat:
+                return {'error': 'Not in combat'}, 409
+            return {'enemy': engine.active_combat.enemy.name, **combat_odds(engine.active_combat)}, 200
+
+    try:
+        player, enemy = data['player'], data['enemy']
+        stats = [int(player['health']), int(enemy['health']), int(player['attack_power']), int(enemy['attack_power']),
+                 int(player.get('max_health', player['health'])), int(enemy.get('max_health', enemy['health']))]
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return {'error': 'Expected a game_id, or player and enemy with health and attack_power'}, 400
+
+    turn = data.get('turn', 'start')
+    if turn not in ('player', 'enemy', 'start'):
+        return {'error': "turn must be 'player', 'enemy' or 'start'"}, 400
+    if not all(0 <= stat <= MAX_ODDS_STAT for stat in stats):
+        return {'error': f'Health and attack power must be between 0 and {MAX_ODDS_STAT}'}, 400
+    player_health, enemy_health, player_attack, enemy_attack, player_max, enemy_max = stats
+    if max(player_health, player_max) * max(enemy_health, enemy_max) * max(player_attack, enemy_attack) > MAX_ODDS_WORK:
+        return {'error': f'Matchup too large to solve: max health times max health times attack power '
+                         f'must be at most {MAX_ODDS_WORK}'}, 400
+    return fight_odds(*stats, turn=turn), 200
+
+
+def _load_game(game_id):
+    """Return a live session, recovering it from the journal if the session store lost it."""
+    game = games.get(game_id)
+    if game is None and journal is not None:
+        game = _recover(game_id)
+    if game is not None and 'marks' not in game:
+        # a session fresh from the store is exactly what its saved state version describes
+        game['marks'] = _state_marks(game['engine'])
+    return game
+
+
+def _recover(game_id):
+    """Rebuild a session from its latest journal snapshot and replay the requests logged after it."""
+    recovered = journal.recover(game_id)
+    if recovered is None:
+        return None
+
+    state, entries = recovered
+    game = SessionManager.session_from_dict(state)
+    game['marks'] = _state_marks(game['engine'])
+    for entry in entries:
+        engine = game['engine']
+        populations = entry.get('populations')
+        if populations and engine.world is not None:
+            engine.world.enemy_pool = ReplayPool(populations)
+        for command_text in entry['commands']:
+            _dispatch(game, command_text)
+        if engine.world is not None:
+            engine.world.enemy_pool = engine.enemy_pool
+        _track_changes(game)
+
+    games[game_id] = game
+    log.info("recovered game", extra={'game_id': game_id, 'replayed': len(entries)})
+    return game
+
+
+def _record_pool(engine):
+    """Have the world take pooled enemies through a recorder, so the journal can replay them."""
+    world = engine.world
+    if journal is None or world is None or world.enemy_pool is None:
+        return None
+    recorder = RecordingPool(world.enemy_pool)
+    world.enemy_pool = recorder
+    return recorder
+
+
+def _unrecord_pool(engine, recorder):
+    """Give the world back the pool _record_pool put a recorder in front of."""
+    if recorder is not None and engine.world is not None and engine.world.enemy_pool is recorder:
+        engine.world.enemy_pool = recorder.pool
+
+
+def _journal(game_id, game, commands, recorder):
+    """Log a finished request, or a fresh snapshot when replaying it would not be enough."""
+    if journal is None:
+        return
+
+    # undo rewinds to history the journal does not have, so the outcome is logged instead
+    if any(command_verb(command_text) == 'undo' for command_text in commands):
+        journal.snapshot(game_id, SessionManager.session_to_dict(game))
+    elif journal.append(game_id, commands, recorder.taken if recorder is not None else ()):
+        journal.snapshot(game_id, SessionManager.session_to_dict(game))
+
+
+def _run_command(game, command_text):
+    """Run one command, recording its latency and any combat it starts or ends."""
+    engine = game['engine']
+    in_combat = engine.in_combat
+
+    if in_combat:
+        enemy = engine.active_combat.enemy
+        action = parse_combat_command(command_text)[0]
+        timer = metrics.Timer(action if action in COMBAT_ACTION_LABELS else 'invalid', 'combat')
+    else:
+        timer = metrics.Timer(command_verb(command_text) or 'unknown', 'world')
+
+    with timer:
+        response = _dispatch(game, command_text)
+
+    if log.isEnabledFor(logging.DEBUG):
+        verb, path = timer.labels
+        log.debug("command", extra={'command': command_text, 'verb': verb, 'path': path,
+                                    'messages': len(response['messages']), 'in_combat': engine.in_combat})
+
+    if not in_combat and engine.in_combat:
+        metrics.combats_started.inc()
+    elif in_combat and not engine.in_combat:
+        if not engine.player.is_alive():
+            metrics.combats_finished.inc('lost')
+        elif not enemy.is_alive():
+            metrics.combats_finished.inc('won')
+        else:
+            metrics.combats_finished.inc('fled')
+    return response
+
+
+def _dispatch(game, command_text):
+    """Run one command and return its response payload, without the player block."""
+    engine = game['engine']
+
+    # combat mode: check if player is in combat
+    if engine.in_combat:
+        result = run_combat_command(command_text, engine)
+
+        # process combat result
+        combat_log = result.get("log", [])
+        
+        # format the response
+        response = {
+            'messages': [f"> {command_text}"] + combat_log,
+            'in_combat': engine.in_combat,
+            'game_over': engine.player.health <= 0 or not engine.running
+        }
+        
+        # add enemy info if still in combat
+        if engine.in_combat and engine.active_combat:
+            enemy_state = result.get("enemy", {})
+            response['enemy'] = enemy_state
+        
+        return response
+
+    if command_text.lower() == "quit":
+        engine.running = False
+
+        return {
+            'messages': ["> quit", "Goodbye, traveler! Returning to main menu..."],
+            'game_over': True,
+            'quit': True
+        }
+
+    # normal mode: process regular non-combat commands
+    try:
+        process_command(command_text, engine)
+    except Exception as e:
+        log.exception("command failed", extra={'command': command_text})
+        engine.output.write(f"Error processing command: {e}")
+
+    output = engine.output.drain()
+
+    # combat initiation: encounter/attack commands leave the engine in combat
+    if engine.in_combat:
+        return {
+            'enemy': engine.get_current_combat_state()['enemy'],
+            'messages': [f"> {command_text}"] + output,
+            'in_combat': True,
+            'game_over': False
+        }
+
+    if output:
+        game['messages'] = [f"> {command_text}", "\n".join(output)]
+    else:
+        game['messages'] = [f"> {command_text}", "No response from the game."]
+
+    # return updated game state
+    return {
+        'messages': game['messages'][-10:],  # last 10 messages
+        'in_combat': False,
+        'game_over': not engine.running or not engine.player.is_alive()
+    }
+
+
+def metrics_text():
+    """Return the server metrics in the Prometheus text format."""
+    return metrics.render(games)
+
+
+def _state_marks(engine):
+    """Dirty marks for each of STATE_FIELDS: values that move whenever the field's content does.
+
+    They are counters the engine bumps anyway, so telling what changed never
+    means rebuilding and comparing the state itself. Objects are part of the
+    marks since undo and loading replace them with fresh ones, counters reset.
+    """
+    player = engine.player
+    enemy = engine.active_combat.enemy if engine.in_combat and engine.active_combat else None
+    return {
+        'player': (player, player.stats_version),
+        'inventory': (player, player.inventory_version),
+        'enemy': (enemy, enemy.stats_version) if enemy is not None else None,
+        'region': engine.world.current_region if engine.world else None,
+    }
+
+
+def _track_changes(game):
+    """Bump the session's state version if anything changed and note which fields did.
+
+    ``game['changed']`` maps each field to the version it last changed in, so a
+    client that has seen version ``n`` needs exactly the fields marked above ``n``.
+    """
+    marks = _state_marks(game['engine'])
+    previous = game.get('marks') or {}
+    changed = [field for field in STATE_FIELDS if marks[field] != previous.get(field)]
+
+    if changed or 'state_version' not in game:
+        game['state_version'] = game.get('state_version', 0) + 1
+        game.setdefault('changed', {})
+        for field in changed:
+            game['changed'][field] = game['state_version']
+    game['marks'] = marks
+
+
+def _attach_state(game, response, since):
+    """Add the state version and every field the client has not seen to a response."""
+    _track_changes(game)
+    version = game['state_version']
+    response['version'] = version
+
+    # anything but a version this session actually produced gets the full state
+    if isinstance(since, bool) or not isinstance(since, int) or not 0 < since <= version:
+        since = 0
+    changed = game['changed']
+    engine = game['engine']
+
+    player = {}
+    if changed.get('player', 0) > since:
+        player.update(name=engine.player.name, health=engine.player.health, max_health=engine.player.max_health)
+    if changed.get('inventory', 0) > since:
+        player['inventory'] = engine.player.inventory.summary()
+    if player:
+        response['player'] = player
+
+    if changed.get('region', 0) > since:
+        response['region'] = engine.world.current_region if engine.world else None
+
+    enemy = game['marks']['enemy']
+    if enemy is not None and changed.get('enemy', 0) > since:
+        enemy = enemy[0]
+        response['enemy'] = {
+            'name': enemy.name,
+            'health': enemy.health,
+            'max_health': getattr(enemy, 'max_health', enemy.health)
+        }
+    else:
+        response.pop('enemy', None)
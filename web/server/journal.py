@@ -0,0 +1,264 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+from game.state import enemy_to_dict, enemy_from_dict
+
+# sessions whose requests since their last snapshot are counted; forgetting the oldest count
+# only means that session's next snapshot comes a little later
+TRACKED_SESSIONS = 10000
+
+# the kinds of line in a segment, each written as "<game id>\t<kind>\t<json>\n"
+SNAPSHOT = "snapshot"
+REQUEST = "request"
+
+
+class Journal:
+    """Append-only log of every accepted request, with periodic snapshots of each session.
+
+    Everything this worker logs goes into one segment file at a time in
+    ``directory``, named after its ``shard``. A line is either a snapshot of a
+    whole session, written when the game starts, after an undo and every
+    ``snapshot_every`` requests, or the commands of one request. The snapshot
+    includes the session's dice state, so its commands replay exactly.
+    Appends only go to an in-memory buffer. A background thread writes
+    everything buffered every ``flush_interval`` seconds with a single fsync,
+    so requests never wait on the disk.
+
+    A segment is closed once it holds ``segment_bytes``, and once more than
+    ``max_segments`` are closed the two oldest are merged into one that keeps
+    only each session's lines since its latest snapshot. The journal remembers
+    which segment holds each session's latest snapshot, so recovering one
+    reads from there on and never the history before it.
+    """
+
+    def __init__(self, directory, shard=0, snapshot_every=50, flush_interval=0.05,
+                 segment_bytes=16 * 1024 * 1024, max_segments=8):
+        self.directory = directory
+        self.shard = shard
+        self.snapshot_every = max(1, snapshot_every)
+        self.flush_interval = flush_interval
+        self.segment_bytes = segment_bytes
+        self.max_segments = max(2, max_segments)
+        os.makedirs(self.directory, exist_ok=True)
+        self._pending = []  # (game_id, kind, line) waiting to be written
+        self._since_snapshot = {}  # game_id -> requests logged since its last snapshot, least recent first
+        self._lock = threading.Lock()
+
+        # the segments and the index below are only touched with the flush lock held
+        self._flush_lock = threading.Lock()
+        self._segments = self._closed_segments()  # oldest first
+        self._latest = {}  # game_id -> segment holding its latest snapshot
+        for path in self._segments:
+            for game_id, kind, _ in _read_segment(path):
+                if kind == SNAPSHOT:
+                    self._latest[game_id] = path
+        self._file = None  # the segment being written, opened on the first write
+        self._written = 0
+
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def snapshot(self, game_id, state):
+        """Log the full session state; recovery starts from the latest one."""
+        self._append(game_id, SNAPSHOT, state, count=None)
+
+    def append(self, game_id, commands, populations=()):
+        """Log the commands of one request and the enemy populations it took from the pool.
+
+        Returns True once the session is due for a new snapshot.
+        """
+        entry = {"commands": commands}
+        if populations:
+            entry["populations"] = populations
+        return self._append(game_id, REQUEST, entry, count=1) >= self.snapshot_every
+
+    def recover(self, game_id):
+        """Return ``(snapshot, entries)`` for a session: its latest snapshot and every request after it.
+
+        Returns None if the session has no journal.
+        """
+        if game_id is None:
+            return None
+        self.flush()
+
+        with self._flush_lock:
+            first = self._latest.get(game_id)
+            if first is None:
+                return None
+            segments = self._segments + ([self._file.name] if self._file is not None else [])
+
+            snapshot, entries = None, []
+            for path in segments[segments.index(first):]:
+                for _, kind, text in _read_segment(path, game_id):
+                    try:
+                        entry = json.loads(text)
+                    except ValueError:
+                        continue
+                    if kind == SNAPSHOT:
+                        snapshot, entries = entry, []
+                    else:
+                        entries.append(entry)
+
+        if snapshot is None:
+            return None
+        with self._lock:
+            self._count(game_id, len(entries))
+        return snapshot, entries
+
+    def flush(self):
+        """Write and fsync everything buffered so far."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if batch:
+                self._write(batch)
+
+    def close(self):
+        self._closed.set()
+        self.flush()
+        with self._flush_lock:
+            if self._file is not None:
+                self._file.close()
+                self._segments.append(self._file.name)
+                self._file = None
+
+    def _append(self, game_id, kind, entry, count):
+        """Buffer one line and add ``count`` to the session's requests since its last snapshot.
+
+        A snapshot passes None, which drops the count. Returns the new count.
+        """
+        line = f"{game_id}\t{kind}\t{json.dumps(entry, separators=(',', ':'))}\n"
+        with self._lock:
+            self._pending.append((game_id, kind, line))
+            previous = self._since_snapshot.pop(game_id, 0)
+            if count is None:
+                return 0
+            return self._count(game_id, previous + count)
+
+    def _count(self, game_id, count):
+        # called with self._lock held; re-inserting keeps the least recently counted session first
+        self._since_snapshot.pop(game_id, None)
+        self._since_snapshot[game_id] = count
+        if len(self._since_snapshot) > TRACKED_SESSIONS:
+            del self._since_snapshot[next(iter(self._since_snapshot))]
+        return count
+
+    def _write(self, batch):
+        # called with the flush lock held
+        if self._file is None:
+            # named by shard and start time, so each worker finds its own segments in the order they were written
+            name = f"{self.shard}-{time.time_ns():020d}-{os.getpid()}.segment"
+            self._file = open(os.path.join(self.directory, name), "ab")
+            self._written = 0
+
+        data = "".join(line for _, _, line in batch).encode("utf-8")
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._written += len(data)
+        for game_id, kind, _ in batch:
+            if kind == SNAPSHOT:
+                self._latest[game_id] = self._file.name
+
+        if self._written >= self.segment_bytes:
+            self._file.close()
+            self._segments.append(self._file.name)
+            self._file = None
+            while len(self._segments) > self.max_segments:
+                self._merge_oldest()
+
+    def _merge_oldest(self):
+        """Merge the two oldest closed segments, dropping every line a later snapshot made useless."""
+        first, second = self._segments[0], self._segments[1]
+        chains = {}  # game_id -> its lines since its latest snapshot in the two segments
+        for path in (first, second):
+            for game_id, kind, text in _read_segment(path):
+                line = f"{game_id}\t{kind}\t{text}"
+                if kind == SNAPSHOT:
+                    chains[game_id] = [line]
+                else:
+                    chains.setdefault(game_id, []).append(line)
+
+        # the merged segment takes the place of the oldest, so it still comes before everything after it
+        merged = first + ".tmp"
+        with open(merged, "w", encoding="utf-8") as f:
+            for game_id, lines in chains.items():
+                if self._latest.get(game_id) in (first, second):
+                    f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(merged, first)
+        os.remove(second)
+
+        del self._segments[1]
+        for game_id, path in self._latest.items():
+            if path == second:
+                self._latest[game_id] = first
+
+    def _closed_segments(self):
+        """This shard's segments left by earlier runs, oldest first."""
+        prefix = f"{self.shard}-"
+        segments = []
+        for name in os.listdir(self.directory):
+            if not name.startswith(prefix):
+                continue
+            if name.endswith(".segment.tmp"):
+                os.remove(os.path.join(self.directory, name))  # a merge cut short; the segments it read are intact
+            elif name.endswith(".segment"):
+                segments.append(name)
+        segments.sort(key=lambda name: int(name.split("-")[1]))
+        return [os.path.join(self.directory, name) for name in segments]
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+
+def _read_segment(path, game_id=None):
+    """Yield ``(game_id, kind, json text)`` for every whole line of a segment, or only for one session's."""
+    prefix = f"{game_id}\t" if game_id is not None else ""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            # a line cut short by a crash mid-write has no newline yet; everything before it is intact
+            if not line.startswith(prefix) or not line.endswith("\n"):
+                continue
+            line_id, kind, text = line.split("\t", 2)
+            yield line_id, kind, text
+
+
+class RecordingPool:
+    """Stands in for a world's enemy pool during one request and remembers what it handed out.
+
+    Pooled populations are not reproducible from the session's dice, so they go
+    into the journal with the request that took them.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.taken = []
+
+    def take(self, region):
+        population = self.pool.take(region)
+        # serialized right away, before the request gets to fight any of them
+        self.taken.append(None if population is None else [enemy_to_dict(enemy) for enemy in population])
+        return population
+
+
+class ReplayPool:
+    """Hands out the populations a journal entry recorded, in the order they were taken."""
+
+    def __init__(self, populations):
+        self._populations = list(populations)
+
+    def take(self, region):
+        if not self._populations:
+            return None
+        population = self._populations.pop(0)
+        if population is None:
+            return None  # the pool was empty at the time, so the world rolled its own
+        return [enemy_from_dict(data) for data in population]
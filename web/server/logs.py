@@ -0,0 +1,100 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+# attributes every LogRecord has; anything else was passed in through ``extra``
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format each record as one JSON object per line, keeping ``extra`` fields as keys."""
+
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Let through at most ``rate`` debug records per second.
+
+    Records at INFO and above always pass. The first debug record after a
+    throttled stretch carries a ``suppressed`` count of what was dropped.
+    """
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+        self._window = 0
+        self._count = 0
+        self._suppressed = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+
+        window = int(time.monotonic())
+        with self._lock:
+            if window != self._window:
+                self._window = window
+                self._count = 0
+            if self._count >= self.rate:
+                self._suppressed += 1
+                return False
+            self._count += 1
+            if self._suppressed:
+                record.suppressed, self._suppressed = self._suppressed, 0
+        return True
+
+
+def configure_logging(level=None, debug_rate=None, stream=None):
+    """Send ``mordor`` logs through a queue to a background thread that writes JSON lines.
+
+    The request thread only filters and enqueues the record; JSON encoding and
+    the write happen on the listener thread. ``level`` and ``debug_rate``
+    default to MORDOR_LOG_LEVEL (INFO) and MORDOR_LOG_DEBUG_RATE (debug records
+    per second, 20).
+    """
+    global _listener
+
+    logger = logging.getLogger("mordor")
+    if _listener is not None:
+        return logger
+
+    level = level or os.environ.get("MORDOR_LOG_LEVEL", "INFO")
+    if debug_rate is None:
+        debug_rate = int(os.environ.get("MORDOR_LOG_DEBUG_RATE", 20))
+
+    handler = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    handler.setFormatter(JsonFormatter())
+
+    records = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(records)
+    queue_handler.addFilter(RateLimitFilter(debug_rate))
+
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return logger
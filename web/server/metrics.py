@@ -0,0 +1,127 @@
+import threading
+import time
+from bisect import bisect_left
+
+from game.enemy_pool import shared_pool
+
+# latency bucket bounds in seconds; commands are usually well under a millisecond
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class Counter:
+    """A monotonically increasing count, optionally split by a label value."""
+
+    def __init__(self, name, help_text, label=None):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value=None, amount=1):
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_value, value in sorted(self._values.items(), key=lambda item: str(item[0])):
+            lines.append(f"{self.name}{_labels(self.label, label_value)} {value}")
+        return lines
+
+
+class Histogram:
+    """Bucketed observations keyed by a tuple of label values."""
+
+    def __init__(self, name, help_text, labels, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # label values -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+
+        for label_values, series in sorted(snapshot.items()):
+            pairs = list(zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(pairs + [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(pairs)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(pairs)} {cumulative}")
+        return lines
+
+
+def _labels(label, value):
+    return _format_labels([(label, value)]) if label else ""
+
+
+def _format_labels(pairs):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# request path instrumentation, shared by the Flask and ASGI servers
+command_latency = Histogram("mordor_command_duration_seconds", "Time spent running one game command.",
+                            ("verb", "path"))
+combats_started = Counter("mordor_combats_started_total", "Combats started by encounter or attack.")
+combats_finished = Counter("mordor_combats_finished_total", "Combats that ended, by outcome.", label="outcome")
+
+
+class Timer:
+    """Times a block and records it in ``command_latency`` under the given labels."""
+    __slots__ = ("labels", "start")
+
+    def __init__(self, verb, path):
+        self.labels = (verb, path)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        command_latency.observe(self.labels, time.perf_counter() - self.start)
+
+
+def render(games):
+    """Return every metric in the Prometheus text exposition format."""
+    live_sessions = games.live_sessions()
+    world_objects = sum(session['engine'].world.count_objects() for session in live_sessions
+                        if session['engine'].world is not None)
+
+    lines = command_latency.render() + combats_started.render() + combats_finished.render()
+    lines += [
+        "# HELP mordor_sessions_live Game sessions currently held in memory.",
+        "# TYPE mordor_sessions_live gauge",
+        f"mordor_sessions_live {len(live_sessions)}",
+        "# HELP mordor_sessions Game sessions in memory or hibernated in the session store.",
+        "# TYPE mordor_sessions gauge",
+        f"mordor_sessions {len(games)}",
+        "# HELP mordor_world_objects Objects players can refer to by name in the worlds of live sessions.",
+        "# TYPE mordor_world_objects gauge",
+        f"mordor_world_objects {world_objects}",
+    ]
+
+    pool = shared_pool()
+    if pool is not None:
+        lines += ["# HELP mordor_enemy_pool_ready Ready-made enemy populations waiting per region.",
+                  "# TYPE mordor_enemy_pool_ready gauge"]
+        lines += [f"mordor_enemy_pool_ready{_labels('region', region)} {pool.ready(region)}" for region in pool.regions]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,221 @@
+"""Run the game on every core: one worker process per shard of the sessions, behind a thin router.
+
+``python router.py`` starts ``--workers`` copies of server.py (one per CPU by
+default). Each owns the sessions whose game id carries its shard number, so
+workers never share a lock or a store. The router listens on ``--port``, sends
+new games to the workers in turn and every other request to the worker that
+owns its game id. ``GET /api/metrics`` is answered by the router itself with
+every worker's metrics, labelled by ``shard``. To route to workers started
+elsewhere, list them with ``--backend`` instead.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import select
+import subprocess
+import sys
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sharding import shard_of
+
+# requests that change nothing, so they can be sent again if the worker's answer got lost
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# headers that only describe one hop and must not be passed along
+HOP_HEADERS = {'connection', 'keep-alive', 'transfer-encoding', 'te', 'trailer', 'upgrade',
+               'proxy-authorization', 'proxy-authenticate', 'content-length', 'host'}
+
+
+class Router(ThreadingHTTPServer):
+    """Forwards each request to the worker owning its game, over one kept-alive connection per thread."""
+    daemon_threads = True
+
+    def __init__(self, address, backends):
+        super().__init__(address, RouterHandler)
+        self.backends = [urllib.parse.urlsplit(url) for url in backends]
+        self._next_shard = itertools.count()
+        self._connections = threading.local()
+
+    def pick_shard(self, body):
+        """Return the shard owning the game a request body names, or the next shard in turn for a new game."""
+        try:
+            game_id = json.loads(body).get('game_id') if body else None
+        except (ValueError, AttributeError):
+            game_id = None
+        if game_id is None:
+            return next(self._next_shard) % len(self.backends)
+        return shard_of(game_id, len(self.backends))
+
+    def connection(self, shard, fresh=False):
+        """Return ``(connection, reused)`` for a shard; ``reused`` connections may have gone stale."""
+        connections = self._connections.__dict__.setdefault('by_shard', {})
+        reused = not fresh and shard in connections and not _closed_by_peer(connections[shard])
+        if not reused:
+            if shard in connections:
+                connections[shard].close()
+            backend = self.backends[shard]
+            connections[shard] = http.client.HTTPConnection(backend.hostname, backend.port, timeout=30)
+        return connections[shard], reused
+
+    def exchange(self, shard, method, path, body, headers):
+        """Send one request to a shard and return ``(status, headers, payload)``, or None if it failed.
+
+        A request is only sent again when it never reached the worker: when
+        sending it on a kept-alive connection fails because the worker closed
+        that connection. Once it went out, a lost answer is only retried for
+        safe methods, since the worker may have run the command already.
+        """
+        connection, reused = self.connection(shard)
+        try:
+            connection.request(method, path, body=body or None, headers=headers)
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            if not reused:
+                return None
+            connection, _ = self.connection(shard, fresh=True)
+            try:
+                connection.request(method, path, body=body or None, headers=headers)
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                return None
+
+        for attempt in range(2):
+            try:
+                response = connection.getresponse()
+                return response.status, response.getheaders(), response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if attempt or method not in SAFE_METHODS:
+                    return None
+                connection, _ = self.connection(shard, fresh=True)
+                try:
+                    connection.request(method, path, body=body or None, headers=headers)
+                except (http.client.HTTPException, OSError):
+                    connection.close()
+                    return None
+
+    def metrics(self):
+        """Every worker's metrics in one Prometheus text page, each sample labelled with its shard."""
+        families = {}  # metric name -> (comment lines, samples), in the order first seen
+        for shard in range(len(self.backends)):
+            result = self.exchange(shard, 'GET', '/api/metrics', b'', {})
+            if result is None or result[0] != 200:
+                continue
+            family = None
+            for line in result[2].decode('utf-8').splitlines():
+                if line.startswith('# HELP ') or line.startswith('# TYPE '):
+                    family = line.split()[2]
+                    comments, _ = families.setdefault(family, ([], []))
+                    if line not in comments:
+                        comments.append(line)
+                elif line and not line.startswith('#') and family is not None:
+                    families[family][1].append(_with_shard(line, shard))
+
+        lines = []
+        for comments, samples in families.values():
+            lines.extend(comments)
+            lines.extend(samples)
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _closed_by_peer(connection):
+    """Whether the worker already closed a kept-alive connection; an idle socket only turns readable then."""
+    if connection.sock is None:
+        return False
+    try:
+        return bool(select.select([connection.sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+def _with_shard(sample, shard):
+    """Add a shard label to one Prometheus sample line."""
+    name, _, rest = sample.partition(' ')
+    if name.endswith('}'):
+        return f'{name[:-1]},shard="{shard}"}} {rest}'
+    return f'{name}{{shard="{shard}"}} {rest}'
+
+
+class RouterHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.forward()
+
+    def do_POST(self):
+        self.forward()
+
+    def do_OPTIONS(self):
+        self.forward()
+
+    def forward(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if self.command == 'GET' and self.path.split('?')[0] == '/api/metrics':
+            self.reply(200, [('Content-Type', 'text/plain; version=0.0.4')], self.server.metrics())
+            return
+
+        shard = self.server.pick_shard(body)
+        headers = {key: value for key, value in self.headers.items() if key.lower() not in HOP_HEADERS}
+        result = self.server.exchange(shard, self.command, self.path, body, headers)
+        if result is None:
+            self.send_error(502, f"Worker for shard {shard} did not answer")
+            return
+        self.reply(*result)
+
+    def reply(self, status, headers, payload):
+        self.send_response(status)
+        for key, value in headers:
+            if key.lower() not in HOP_HEADERS:
+                self.send_header(key, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass  # the workers log every request already
+
+
+def start_workers(count, first_port):
+    """Start one server.py per shard and return the processes and their URLs."""
+    server_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server.py')
+    processes, backends = [], []
+    for shard in range(count):
+        port = first_port + shard
+        env = dict(os.environ, MORDOR_SHARD=str(shard), MORDOR_PORT=str(port), MORDOR_DEBUG='0')
+        processes.append(subprocess.Popen([sys.executable, server_path], env=env))
+        backends.append(f"http://127.0.0.1:{port}")
+    return processes, backends
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the game from one worker process per session shard.")
+    parser.add_argument('--port', type=int, default=int(os.environ.get('MORDOR_PORT', 5000)))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="worker processes to start")
+    parser.add_argument('--worker-port', type=int, default=5100, help="port of the first worker")
+    parser.add_argument('--backend', action='append', metavar='URL',
+                        help="route to an already running worker instead; repeat once per shard, in shard order")
+    args = parser.parse_args()
+
+    processes, backends = [], args.backend
+    if not backends:
+        processes, backends = start_workers(max(1, args.workers), args.worker_port)
+
+    router = Router((os.environ.get('MORDOR_HOST', '127.0.0.1'), args.port), backends)
+    try:
+        router.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        router.server_close()
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+class SessionStore:
+    """Interface for places where serialized game sessions are kept.
+
+    A store maps a game id to a ``(version, state)`` pair, where ``state`` is the
+    JSON-compatible session data and ``version`` an opaque token that changes on
+    every save. Stores marked ``shared`` can be read and written by several worker
+    processes at once, so callers must check the version before trusting a copy
+    they already hold, and pass it as ``expected`` when saving the copy back.
+    """
+
+    shared = False
+
+    def load(self, game_id):
+        """Return ``(version, state)`` for a session, or None if it is unknown."""
+        raise NotImplementedError
+
+    def save(self, game_id, version, state, expected=None):
+        """Store a session under a new version token and return whether it was stored.
+
+        Shared stores refuse the save, returning False, when ``expected`` is
+        given and the stored session is no longer at that version: another
+        worker changed it since the caller loaded it. Private stores always save.
+        """
+        raise NotImplementedError
+
+    def delete(self, game_id):
+        """Forget a session."""
+        raise NotImplementedError
+
+    def version(self, game_id):
+        """Return the current version token of a session, or None if it is unknown."""
+        loaded = self.load(game_id)
+        return loaded[0] if loaded else None
+
+    def __contains__(self, game_id):
+        return self.version(game_id) is not None
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def flush(self):
+        """Write out anything still buffered."""
+
+    def close(self):
+        self.flush()
+
+
+class MemorySessionStore(SessionStore):
+    """Keeps serialized sessions in a dict. Fast, but private to one process."""
+
+    def __init__(self):
+        self._sessions = {}
+
+    def load(self, game_id):
+        return self._sessions.get(game_id)
+
+    def save(self, game_id, version, state, expected=None):
+        self._sessions[game_id] = (version, state)
+        return True
+
+    def delete(self, game_id):
+        self._sessions.pop(game_id, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class FileSessionStore(SessionStore):
+    """Keeps one JSON file per session in a local directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def load(self, game_id):
+        try:
+            with open(self._path(game_id), encoding="utf-8") as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return None
+        return record["version"], record["state"]
+
+    def save(self, game_id, version, state, expected=None):
+        path = self._path(game_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "state": state}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)  # never leave a half-written session behind
+        return True
+
+    def delete(self, game_id):
+        try:
+            os.remove(self._path(game_id))
+        except FileNotFoundError:
+            pass
+
+    def __contains__(self, game_id):
+        return os.path.exists(self._path(game_id))
+
+    def __len__(self):
+        return sum(1 for filename in os.listdir(self.directory) if filename.endswith(".json"))
+
+    def _path(self, game_id):
+        # game ids come from the client, so keep them from escaping the directory
+        safe_id = os.path.basename(str(game_id))
+        return os.path.join(self.directory, f"{safe_id}.json")
+
+
+class SQLiteSessionStore(SessionStore):
+    """Keeps sessions in a SQLite database shared by every worker process.
+
+    Saves are written through: ``save`` returns once its write is committed,
+    so other workers see it on their next read. Saves that arrive while a
+    commit is running are grouped into the next one, and a single transaction
+    writes the whole group. A save that names the version its copy was loaded
+    at only goes through if the stored session is still at that version.
+    Connections are pooled and reused across threads, and the database runs
+    in WAL mode so readers never block the writer.
+    """
+
+    shared = True
+
+    def __init__(self, path, pool_size=8):
+        self.path = path
+        self._idle = queue.LifoQueue(maxsize=max(1, pool_size))  # connections not in use right now
+        self._pending = []  # writes waiting for the next commit
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()  # one commit at a time, which also keeps writes in order
+
+        with self._connection() as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "game_id TEXT PRIMARY KEY, version TEXT NOT NULL, state TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+        atexit.register(self.close)
+
+    @contextmanager
+    def _connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL, and much cheaper than FULL
+        try:
+            yield conn
+        finally:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def load(self, game_id):
+        with self._connection() as conn:
+            row = conn.execute("SELECT version, state FROM sessions WHERE game_id = ?", (game_id,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def version(self, game_id):
+        with self._connection() as conn:
+            row = conn.execute("SELECT version FROM sessions WHERE game_id = ?", (game_id,)).fetchone()
+        return row[0] if row else None
+
+    def save(self, game_id, version, state, expected=None):
+        write = _Write(game_id, version, json.dumps(state, separators=(",", ":")), expected)
+        with self._lock:
+            self._pending.append(write)
+        with self._commit_lock:
+            # whoever held the lock before us may have committed our write along with theirs
+            if write.saved is None:
+                self._commit_pending()
+        return write.saved
+
+    def delete(self, game_id):
+        with self._commit_lock, self._connection() as conn, conn:
+            conn.execute("DELETE FROM sessions WHERE game_id = ?", (game_id,))
+
+    def __len__(self):
+        with self._connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _commit_pending(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        now = time.time()
+        try:
+            with self._connection() as conn, conn:  # one transaction for the whole group
+                for write in batch:
+                    if write.expected is None:
+                        conn.execute(
+                            "INSERT INTO sessions (game_id, version, state, updated) VALUES (?, ?, ?, ?) "
+                            "ON CONFLICT(game_id) DO UPDATE SET "
+                            "version = excluded.version, state = excluded.state, updated = excluded.updated",
+                            (write.game_id, write.version, write.state, now),
+                        )
+                        write.saved = True
+                    else:
+                        cursor = conn.execute(
+                            "UPDATE sessions SET version = ?, state = ?, updated = ? WHERE game_id = ? AND version = ?",
+                            (write.version, write.state, now, write.game_id, write.expected),
+                        )
+                        write.saved = cursor.rowcount == 1
+        except BaseException:
+            for write in batch:
+                write.saved = False
+            raise
+
+
+class _Write:
+    """One save waiting to be committed; ``saved`` is None until it is."""
+    __slots__ = ("game_id", "version", "state", "expected", "saved")
+
+    def __init__(self, game_id, version, state, expected):
+        self.game_id = game_id
+        self.version = version
+        self.state = state
+        self.expected = expected
+        self.saved = None
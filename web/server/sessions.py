@@ -0,0 +1,190 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from game.output import OutputBuffer
+from game.state import engine_to_dict, engine_from_dict
+from session_store import MemorySessionStore
+
+# session keys that only mean something in this process; "snapshot" is what older saves kept instead of marks
+TRANSIENT_KEYS = ("marks", "snapshot")
+
+
+class SessionManager:
+    """Keeps active game sessions in memory with LRU ordering and idle eviction.
+
+    Sessions beyond ``max_sessions`` or idle for longer than ``idle_ttl`` seconds
+    are hibernated into ``store`` and rehydrated the next time they are requested,
+    so a long-running server does not grow without limit. With a shared store
+    every change is written through with ``save`` and cached copies are checked
+    against the stored version, so several workers can serve the same sessions.
+
+    The manager is safe to share between request threads. Callers hold
+    ``lock(game_id)`` while a command runs on a session, and a locked session
+    is never hibernated from under them.
+    """
+
+    # striped per-session locks: a fixed set shared by hash, so they never need cleaning up
+    LOCK_STRIPES = 64
+
+    def __init__(self, store=None, max_sessions=500, idle_ttl=900):
+        self.store = store if store is not None else MemorySessionStore()
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl = idle_ttl
+        self._sessions = OrderedDict()  # game_id -> session, least recently used first
+        self._last_seen = {}
+        self._versions = {}  # version token of the stored copy each cached session matches
+        self._lock = threading.RLock()  # guards the maps above and their store entries
+        self._session_locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+
+    def __contains__(self, game_id):
+        with self._lock:
+            return game_id in self._sessions or game_id in self.store
+
+    def __len__(self):
+        """Count both live and hibernated sessions."""
+        with self._lock:
+            if self.store.shared:
+                return len(self.store)  # live sessions are always written through
+            return len(self._sessions) + len(self.store)
+
+    def __getitem__(self, game_id):
+        session = self.get(game_id)
+        if session is None:
+            raise KeyError(game_id)
+        return session
+
+    def __setitem__(self, game_id, session):
+        with self._lock:
+            self._cache(game_id, session)
+            if self.store.shared:
+                self.save(game_id)
+            self.evict()
+
+    def lock(self, game_id):
+        """Lock to hold while running a command on a session."""
+        return self._session_locks[hash(str(game_id)) % self.LOCK_STRIPES]
+
+    def get(self, game_id, default=None):
+        """Return a session, rehydrating it from the store if it is not in memory."""
+        with self._lock:
+            return self._get(game_id, default)
+
+    def _get(self, game_id, default):
+        session = self._sessions.get(game_id)
+
+        if session is not None and self.store.shared:
+            # another worker may have moved this session on since we cached it
+            if self.store.version(game_id) != self._versions[game_id]:
+                session = None
+
+        if session is None:
+            loaded = self.store.load(game_id)
+            if loaded is None:
+                return default
+            version, state = loaded
+            session = self.session_from_dict(state)
+            if not self.store.shared:
+                self.store.delete(game_id)
+            self._cache(game_id, session, version)
+        else:
+            self._cache(game_id, session, self._versions[game_id])
+
+        self.evict()
+        return session
+
+    def save(self, game_id):
+        """Write a session back to the store after it changed.
+
+        Returns False if another worker saved the session since this copy was
+        loaded. The copy is dropped then, so the next get loads theirs.
+        """
+        with self._lock:
+            session = self._sessions.get(game_id)
+            if session is None or not self.store.shared:
+                return True  # private stores only need the session once it is hibernated
+
+            version = uuid.uuid4().hex
+            if not self.store.save(game_id, version, self.session_to_dict(session), expected=self._versions[game_id]):
+                del self._sessions[game_id]
+                del self._last_seen[game_id]
+                del self._versions[game_id]
+                return False
+            self._versions[game_id] = version
+            return True
+
+    def live_sessions(self):
+        """Return the sessions currently held in memory, without touching the store."""
+        with self._lock:
+            return list(self._sessions.values())
+
+    @property
+    def live_count(self):
+        """Number of sessions currently held in memory."""
+        return len(self._sessions)
+
+    def evict(self):
+        """Hibernate idle sessions and trim memory down to the session ceiling.
+
+        Sessions with a command running are skipped and stay in memory for now.
+        """
+        with self._lock:
+            now = time.monotonic()
+
+            # the oldest entries come first, so stop at the first one still fresh
+            for game_id in list(self._sessions):
+                if now - self._last_seen[game_id] < self.idle_ttl:
+                    break
+                self.hibernate(game_id)
+
+            excess = len(self._sessions) - self.max_sessions
+            for game_id in list(self._sessions):
+                if excess <= 0:
+                    break
+                if self.hibernate(game_id):
+                    excess -= 1
+
+    def hibernate(self, game_id):
+        """Move a session from memory into the store; returns False if it is in use or not in memory."""
+        session_lock = self.lock(game_id)
+        if not session_lock.acquire(blocking=False):
+            return False
+        try:
+            with self._lock:
+                session = self._sessions.get(game_id)
+                if session is None:
+                    return False
+
+                # written before it leaves memory, so a concurrent get always finds it in one place
+                version = self._versions[game_id]
+                # shared stores already hold the latest copy of anything that was saved
+                if not self.store.shared or version is None:
+                    self.store.save(game_id, uuid.uuid4().hex, self.session_to_dict(session))
+
+                del self._sessions[game_id]
+                del self._last_seen[game_id]
+                del self._versions[game_id]
+                return True
+        finally:
+            session_lock.release()
+
+    def _cache(self, game_id, session, version=None):
+        self._sessions[game_id] = session
+        self._sessions.move_to_end(game_id)
+        self._last_seen[game_id] = time.monotonic()
+        self._versions[game_id] = version
+
+    @staticmethod
+    def session_to_dict(session):
+        # everything next to the engine (messages, state version, ...) is plain data already,
+        # but for the dirty marks, which point into the engine and are simply retaken after loading
+        data = {key: value for key, value in session.items() if key not in TRANSIENT_KEYS}
+        data["engine"] = engine_to_dict(session["engine"])
+        return data
+
+    @staticmethod
+    def session_from_dict(data):
+        session = {key: value for key, value in data.items() if key not in TRANSIENT_KEYS}
+        session["engine"] = engine_from_dict(data["engine"], output=OutputBuffer())
+        return session
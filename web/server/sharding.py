@@ -0,0 +1,18 @@
+import os
+import secrets
+
+# which shard of the sessions this worker owns; set by router.py when it starts the workers
+SHARD = int(os.environ.get('MORDOR_SHARD', 0))
+
+
+def new_game_id(shard=None):
+    """Return a fresh, unguessable game id that records the shard owning the session."""
+    return f"{SHARD if shard is None else shard}-{secrets.token_urlsafe(12)}"
+
+
+def shard_of(game_id, shards):
+    """Return the shard that owns a game id; ids without a valid shard belong to shard 0."""
+    prefix, sep, _ = str(game_id).partition('-')
+    if sep and prefix.isdigit() and int(prefix) < shards:
+        return int(prefix)
+    return 0